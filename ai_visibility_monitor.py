@@ -4,25 +4,31 @@ RankAled Phase 1: AI Search Visibility Monitor
 Integrates DataForSEO APIs to track brand visibility across AI-powered search results
 """
 
+import asyncio
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Tuple
 from dataclasses import dataclass, asdict
 import os
+from pathlib import Path
+
+from coalesce import RequestCoalescer
 
 # Load environment variables from .env file if it exists
 def load_env():
     """Load environment variables from .env file"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+    env_path = Path(__file__).with_name('.env')
+    if env_path.exists():
+        lines = (line.strip() for line in env_path.read_text().splitlines())
+        os.environ.update(
+            line.split('=', 1) for line in lines
+            if line and not line.startswith('#') and '=' in line
+        )
 
 load_env()
 
@@ -71,6 +77,40 @@ class AIVisibilityResult:
     competitor_ai_scores: Dict[str, float] = None
     ai_dominance_rank: int = 0  # 1-based ranking among brand + competitors
 
+class RateLimiter:
+    """Token bucket rate limiter: bursts up to max_calls, refilled evenly over period seconds"""
+    
+    def __init__(self, max_calls: int, period: float):
+        self.capacity = max_calls
+        self.tokens = float(max_calls)
+        self.fill_rate = max_calls / period
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only when the bucket is empty"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.fill_rate)
+            self.last_refill = now
+            
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.fill_rate)
+                self.tokens = 1.0
+                self.last_refill = time.monotonic()
+            
+            self.tokens -= 1
+
+# Ask for compressed responses; brotli is only advertised when a decoder is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# DataForSEO accepts up to 100 tasks in one task-array POST
+MAX_TASKS_PER_POST = 100
+
 class DataForSEOClient:
     """DataForSEO API client for AI visibility monitoring"""
     
@@ -80,7 +120,26 @@ class DataForSEOClient:
         self.base_url = "https://api.dataforseo.com/v3"
         self.session = requests.Session()
         self.session.auth = (login, password)
-        self.session.headers.update({'Content-Type': 'application/json'})
+        self.session.headers.update({'Content-Type': 'application/json', 'Accept-Encoding': ACCEPT_ENCODING})
+        # Throttled (429) calls were not processed, so they are safe to retry, POSTs included
+        self.session.mount('https://', HTTPAdapter(max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429],
+            allowed_methods=frozenset({'GET', 'POST'}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )))
+        self.coalescer = RequestCoalescer()
+    
+    def _post_json(self, url: str, payload: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """POST a task payload, sharing the response with concurrent identical requests"""
+        def post():
+            response = self.session.post(url, json=payload)
+            response.raise_for_status()
+            return response.json()
+        
+        return self.coalescer.fetch((url, json.dumps(payload, sort_keys=True)), post)
     
     def get_location_code(self, location_name: str) -> int:
         """Convert location name to DataForSEO location code"""
@@ -209,10 +268,7 @@ class DataForSEOClient:
         }]
         
         try:
-            response = self.session.post(url, json=payload)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._post_json(url, payload)
             keywords = []
             
             if data.get('tasks') and data['tasks'][0].get('result'):
@@ -253,9 +309,7 @@ class DataForSEOClient:
         }]
         
         try:
-            response = self.session.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
+            return self._post_json(url, payload)
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 402:
                 print(f"⚠️  Insufficient credits for Google SERP - '{keyword}'")
@@ -283,9 +337,7 @@ class DataForSEOClient:
         }]
         
         try:
-            response = self.session.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
+            return self._post_json(url, payload)
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 402:
                 print(f"⚠️  Insufficient credits for Bing SERP - '{keyword}'")
@@ -298,6 +350,36 @@ class DataForSEOClient:
             print(f"Error fetching Bing SERP for '{keyword}': {e}")
             return {}
     
+    def get_serp_batch(self, engine: str, keywords: List[str], location: str, device: str, language: str) -> Dict[str, Dict[str, Any]]:
+        """Get SERPs for many keywords via task-array POSTs, keyed by keyword in single-task response shape"""
+        url = f"{self.base_url}/serp/{engine}/organic/live/advanced"
+        
+        task = {
+            "location_code": self.get_location_code(location),
+            "language_code": self.get_language_code(language),
+            "device": device
+        }
+        if engine == "google":
+            task["os"] = "windows" if device == "desktop" else "android"
+        
+        results = {}
+        for start in range(0, len(keywords), MAX_TASKS_PER_POST):
+            payload = [{"keyword": keyword, **task} for keyword in keywords[start:start + MAX_TASKS_PER_POST]]
+            
+            try:
+                data = self._post_json(url, payload)
+            except Exception as e:
+                print(f"Error fetching {engine.title()} SERP batch: {e}")
+                continue
+            
+            # Correlate tasks back to keywords via the echoed task data
+            for task_result in data.get('tasks') or []:
+                keyword = (task_result.get('data') or {}).get('keyword')
+                if keyword:
+                    results[keyword] = {'tasks': [task_result]}
+        
+        return results
+    
     def get_knowledge_graph(self, brand_name: str, location: str, language: str) -> Dict[str, Any]:
         """Get Google Knowledge Graph for brand entity using live endpoint"""
         url = f"{self.base_url}/serp/google/organic/live/advanced"
@@ -313,9 +395,7 @@ class DataForSEOClient:
         }]
         
         try:
-            response = self.session.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
+            data = self._post_json(url, payload)
             
             # Extract Knowledge Graph from organic results
             if data.get('tasks') and data['tasks'][0].get('result'):
@@ -336,6 +416,32 @@ class AIVisibilityAnalyzer:
     def __init__(self, brand_domain: str, competitor_domains: List[str]):
         self.brand_domain = brand_domain
         self.competitor_domains = competitor_domains
+        
+        # Normalize domains once so citation checks are plain lookups
+        self.brand_clean = self.clean_domain(brand_domain)
+        self.brand_variants = frozenset((self.brand_clean, f"www.{self.brand_clean}"))
+        self.competitors_by_domain = {}
+        for comp_domain in competitor_domains:
+            self.competitors_by_domain.setdefault(self.clean_domain(comp_domain), []).append(comp_domain)
+    
+    def clean_domain(self, domain: str) -> str:
+        """Normalize a domain for comparison"""
+        return domain.lower().replace('www.', '')
+    
+    def brand_in(self, domains: Iterable[str]) -> bool:
+        """Check whether any raw domain is the brand (with or without www.)"""
+        return not self.brand_variants.isdisjoint(domains)
+    
+    def record_citation(self, analysis: Dict[str, Any], domain: str):
+        """Record an AI Overview citation and match it against brand and competitors"""
+        analysis['ai_citations'].append(domain)
+        
+        domain_clean = self.clean_domain(domain)
+        if domain_clean == self.brand_clean:
+            analysis['brand_cited'] = True
+        
+        for comp_domain in self.competitors_by_domain.get(domain_clean, ()):
+            analysis['competitor_citations'][comp_domain] = analysis['competitor_citations'].get(comp_domain, 0) + 1
     
     def extract_domain_from_url(self, url: str) -> str:
         """Extract domain from URL"""
@@ -347,6 +453,36 @@ class AIVisibilityAnalyzer:
         except:
             return ""
     
+    def _iter_overview_citations(self, item: Dict[str, Any]) -> Iterator[Tuple[str, bool]]:
+        """Yield (domain, from_links) for each citation in an AI Overview item"""
+        citations_found = False
+        
+        # Try 'references' field first (newer structure), then 'items' as fallback
+        for field in ('references', 'items'):
+            for ref in item.get(field) or ():
+                domain = ref.get('domain') or self.extract_domain_from_url(ref.get('url', ''))
+                if domain:
+                    citations_found = True
+                    yield domain, False
+            if citations_found:
+                return
+        
+        # Legacy fallback to 'links' field
+        for link in item.get('links') or ():
+            domain = self.extract_domain_from_url(link.get('url', ''))
+            if domain:
+                yield domain, True
+    
+    def iter_ai_citations(self, serp_data: Dict[str, Any]) -> Iterator[str]:
+        """Lazily yield AI Overview citation domains in the order analyze_google_serp records them"""
+        if not serp_data.get('tasks') or not serp_data['tasks'][0].get('result'):
+            return
+        
+        for item in serp_data['tasks'][0]['result'][0].get('items', []):
+            if item.get('type', '') == 'ai_overview':
+                for domain, _ in self._iter_overview_citations(item):
+                    yield domain
+    
     def analyze_google_serp(self, serp_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze Google SERP for AI Overview and SERP features"""
         analysis = {
@@ -372,75 +508,13 @@ class AIVisibilityAnalyzer:
             if item_type == 'ai_overview':
                 analysis['ai_overview_present'] = True
                 
-                # Extract citations from AI Overview using the correct structure
-                citations_found = False
-                
-                # Try 'references' field first (newer structure)
-                if 'references' in item and item['references']:
-                    for ref in item['references']:
-                        url = ref.get('url', '')
-                        domain = ref.get('domain') or self.extract_domain_from_url(url)
-                        if domain:
-                            citations_found = True
-                            analysis['ai_citations'].append(domain)
-                            
-                            # Check brand citation (clean both domains for comparison)
-                            domain_clean = domain.lower().replace('www.', '')
-                            brand_clean = self.brand_domain.lower().replace('www.', '')
-                            if domain_clean == brand_clean:
-                                analysis['brand_cited'] = True
-                            
-                            # Count competitor citations
-                            for comp_domain in self.competitor_domains:
-                                comp_clean = comp_domain.lower().replace('www.', '')
-                                domain_clean_for_comp = domain.lower().replace('www.', '')
-                                if domain_clean_for_comp == comp_clean:
-                                    analysis['competitor_citations'][comp_domain] = analysis['competitor_citations'].get(comp_domain, 0) + 1
-                
-                # Try 'items' field as fallback
-                if not citations_found and 'items' in item and item['items']:
-                    for sub_item in item['items']:
-                        url = sub_item.get('url', '')
-                        domain = sub_item.get('domain') or self.extract_domain_from_url(url)
-                        if domain:
-                            citations_found = True
-                            analysis['ai_citations'].append(domain)
-                            
-                            # Check brand citation (clean both domains for comparison)
-                            domain_clean = domain.lower().replace('www.', '')
-                            brand_clean = self.brand_domain.lower().replace('www.', '')
-                            if domain_clean == brand_clean:
-                                analysis['brand_cited'] = True
-                            
-                            # Count competitor citations
-                            for comp_domain in self.competitor_domains:
-                                comp_clean = comp_domain.lower().replace('www.', '')
-                                domain_clean_for_comp = domain.lower().replace('www.', '')
-                                if domain_clean_for_comp == comp_clean:
-                                    analysis['competitor_citations'][comp_domain] = analysis['competitor_citations'].get(comp_domain, 0) + 1
-                
-                # Legacy fallback to 'links' field
-                if not citations_found and 'links' in item and item['links']:
-                    for link in item['links']:
-                        url = link.get('url', '')
-                        domain = self.extract_domain_from_url(url)
-                        if domain:
-                            analysis['ai_citations'].append(domain)
-                            
-                            # Check brand citation (clean both domains for comparison)
-                            domain_clean = domain.lower().replace('www.', '')
-                            brand_clean = self.brand_domain.lower().replace('www.', '')
-                            if domain_clean == brand_clean:
-                                analysis['brand_cited'] = True
-                            
-                            # Count competitor citations
-                            for comp_domain in self.competitor_domains:
-                                comp_clean = comp_domain.lower().replace('www.', '')
-                                domain_clean_for_comp = domain.lower().replace('www.', '')
-                                if domain_clean_for_comp == comp_clean:
-                                    analysis['competitor_citations'][comp_domain] = analysis['competitor_citations'].get(comp_domain, 0) + 1
-                                if domain == comp_clean:
-                                    analysis['competitor_citations'][comp_domain] = analysis['competitor_citations'].get(comp_domain, 0) + 1
+                for domain, from_links in self._iter_overview_citations(item):
+                    self.record_citation(analysis, domain)
+                    
+                    # Legacy links are also matched on the raw domain
+                    if from_links:
+                        for comp_domain in self.competitors_by_domain.get(domain, ()):
+                            analysis['competitor_citations'][comp_domain] = analysis['competitor_citations'].get(comp_domain, 0) + 1
             
             # Other SERP features
             elif item_type == 'featured_snippet':
@@ -483,11 +557,8 @@ class AIVisibilityAnalyzer:
                 # Check if brand is mentioned (clean both domains for comparison)
                 url = item.get('url', '')
                 domain = self.extract_domain_from_url(url)
-                if domain:
-                    domain_clean = domain.lower().replace('www.', '')
-                    brand_clean = self.brand_domain.lower().replace('www.', '')
-                    if domain_clean == brand_clean:
-                        analysis['brand_visibility'] = True
+                if domain and self.clean_domain(domain) == self.brand_clean:
+                    analysis['brand_visibility'] = True
             
             # Bing People Also Ask (may appear as 'people_also_ask' or 'related_searches')
             elif item_type in ['people_also_ask', 'related_searches', 'related_questions']:
@@ -586,9 +657,13 @@ class AIVisibilityMonitor:
     def __init__(self, dataforseo_login: str, dataforseo_password: str):
         self.client = DataForSEOClient(dataforseo_login, dataforseo_password)
         self.results = []
+        
+        # One keyword per second, the pacing documented in the README; a burst of 1 keeps the first
+        # keyword immediate without letting a 20-keyword run go out back to back
+        self.rate_limiter = RateLimiter(max_calls=1, period=1.0)
     
-    def run_analysis(self, user_input: UserInput) -> List[AIVisibilityResult]:
-        """Main user journey: analyze AI visibility for brand"""
+    def _prepare_analysis(self, user_input: UserInput) -> Tuple['AIVisibilityAnalyzer', List[str]]:
+        """Steps 1-2: discover keywords and check the Knowledge Graph"""
         print(f"\n🚀 Starting AI Visibility Analysis for {user_input.brand_name}")
         print(f"📍 Location: {user_input.location}")
         print(f"📱 Device: {user_input.device}")
@@ -619,87 +694,136 @@ class AIVisibilityMonitor:
         else:
             print(f"ℹ️  No Knowledge Graph found for {user_input.brand_name}")
         
-        # Step 3: Analyze each keyword
-        for i, keyword in enumerate(all_keywords[:20], 1):  # Limit to 20 keywords for demo
-            print(f"\n📈 Analyzing keyword {i}/20: '{keyword}'")
-            
-            result = AIVisibilityResult(
-                query=keyword,
-                location=user_input.location,
-                device=user_input.device,
-                timestamp=datetime.now().isoformat(),
-                google_competitor_citations={},
-                google_ai_citations=[],
-                bing_ai_features=[],
-                people_also_ask_queries=[],
-                bing_people_also_ask_queries=[],
-                competitor_ai_scores={}
-            )
-            
-            # Google SERP Analysis
-            print(f"  🔴 Fetching Google SERP...")
+        return analyzer, all_keywords[:20]  # Limit to 20 keywords for demo
+    
+    def _analyze_keyword(self, analyzer: 'AIVisibilityAnalyzer', user_input: UserInput,
+                         i: int, keyword: str, emit=print,
+                         google_data: Optional[Dict[str, Any]] = None,
+                         bing_data: Optional[Dict[str, Any]] = None) -> AIVisibilityResult:
+        """Step 3: fetch (unless prefetched) and score Google and Bing SERPs for one keyword"""
+        # Rate limiting
+        self.rate_limiter.acquire()
+        
+        emit(f"\n📈 Analyzing keyword {i}/20: '{keyword}'")
+        
+        result = AIVisibilityResult(
+            query=keyword,
+            location=user_input.location,
+            device=user_input.device,
+            timestamp=datetime.now().isoformat(),
+            google_competitor_citations={},
+            google_ai_citations=[],
+            bing_ai_features=[],
+            people_also_ask_queries=[],
+            bing_people_also_ask_queries=[],
+            competitor_ai_scores={}
+        )
+        
+        # Google SERP Analysis
+        if google_data is None:
+            emit(f"  🔴 Fetching Google SERP...")
             google_data = self.client.get_google_serp_advanced(
                 keyword, user_input.location, user_input.device, user_input.language
             )
-            
-            google_analysis = {}
-            if google_data:
-                google_analysis = analyzer.analyze_google_serp(google_data)
-                result.google_ai_overview_present = google_analysis['ai_overview_present']
-                result.google_ai_citations = google_analysis['ai_citations']
-                result.google_brand_cited = google_analysis['brand_cited']
-                result.google_competitor_citations = google_analysis['competitor_citations']
-                result.featured_snippet_present = google_analysis['featured_snippet_present']
-                result.knowledge_graph_present = google_analysis['knowledge_graph_present']
-                result.people_also_ask_present = google_analysis['people_also_ask_present']
-                result.people_also_ask_queries = google_analysis['people_also_ask_queries']
-                
-                if google_analysis['ai_overview_present']:
-                    print(f"    ✅ AI Overview found! Brand cited: {google_analysis['brand_cited']}")
-                else:
-                    print(f"    ❌ No AI Overview")
-            
-            # Bing SERP Analysis
-            print(f"  🔵 Fetching Bing SERP...")
+        
+        google_analysis = {}
+        if google_data:
+            google_analysis = analyzer.analyze_google_serp(google_data)
+            result.google_ai_overview_present = google_analysis['ai_overview_present']
+            result.google_ai_citations = google_analysis['ai_citations']
+            result.google_brand_cited = google_analysis['brand_cited']
+            result.google_competitor_citations = google_analysis['competitor_citations']
+            result.featured_snippet_present = google_analysis['featured_snippet_present']
+            result.knowledge_graph_present = google_analysis['knowledge_graph_present']
+            result.people_also_ask_present = google_analysis['people_also_ask_present']
+            result.people_also_ask_queries = google_analysis['people_also_ask_queries']
+            
+            if google_analysis['ai_overview_present']:
+                emit(f"    ✅ AI Overview found! Brand cited: {google_analysis['brand_cited']}")
+            else:
+                emit(f"    ❌ No AI Overview")
+        
+        # Bing SERP Analysis
+        if bing_data is None:
+            emit(f"  🔵 Fetching Bing SERP...")
             bing_data = self.client.get_bing_serp_advanced(
                 keyword, user_input.location, user_input.device, user_input.language
             )
+        
+        bing_analysis = {}
+        if bing_data:
+            bing_analysis = analyzer.analyze_bing_serp(bing_data)
+            result.bing_ai_features = bing_analysis['ai_features']
+            result.bing_brand_visibility = bing_analysis['brand_visibility']
+            result.bing_people_also_ask_present = bing_analysis['people_also_ask_present']
+            result.bing_people_also_ask_queries = bing_analysis['people_also_ask_queries']
             
-            bing_analysis = {}
-            if bing_data:
-                bing_analysis = analyzer.analyze_bing_serp(bing_data)
-                result.bing_ai_features = bing_analysis['ai_features']
-                result.bing_brand_visibility = bing_analysis['brand_visibility']
-                result.bing_people_also_ask_present = bing_analysis['people_also_ask_present']
-                result.bing_people_also_ask_queries = bing_analysis['people_also_ask_queries']
-                
-                if bing_analysis['ai_features']:
-                    print(f"    ✅ Bing AI features: {', '.join(bing_analysis['ai_features'])}")
-                else:
-                    print(f"    ❌ No Bing AI features")
-                
-                if bing_analysis['people_also_ask_present']:
-                    print(f"    ✅ Bing PAA found: {len(bing_analysis['people_also_ask_queries'])} questions")
-                else:
-                    print(f"    ❌ No Bing PAA")
-            
-            # Calculate AI Visibility Scores
-            if google_analysis and bing_analysis:
-                result.ai_visibility_score = analyzer.calculate_ai_visibility_score(google_analysis, bing_analysis)
-                result.competitor_ai_scores = analyzer.calculate_competitor_scores(google_analysis, bing_analysis)
-                result.ai_dominance_rank = analyzer.calculate_ai_dominance_rank(
-                    result.ai_visibility_score, 
-                    result.competitor_ai_scores
-                )
-                
-                print(f"    📊 AI Visibility Score: {result.ai_visibility_score:.1f}/100")
-                if result.competitor_ai_scores:
-                    print(f"    🏆 AI Dominance Rank: #{result.ai_dominance_rank} among {len(result.competitor_ai_scores) + 1} entities")
+            if bing_analysis['ai_features']:
+                emit(f"    ✅ Bing AI features: {', '.join(bing_analysis['ai_features'])}")
+            else:
+                emit(f"    ❌ No Bing AI features")
             
-            self.results.append(result)
+            if bing_analysis['people_also_ask_present']:
+                emit(f"    ✅ Bing PAA found: {len(bing_analysis['people_also_ask_queries'])} questions")
+            else:
+                emit(f"    ❌ No Bing PAA")
+        
+        # Calculate AI Visibility Scores
+        if google_analysis and bing_analysis:
+            result.ai_visibility_score = analyzer.calculate_ai_visibility_score(google_analysis, bing_analysis)
+            result.competitor_ai_scores = analyzer.calculate_competitor_scores(google_analysis, bing_analysis)
+            result.ai_dominance_rank = analyzer.calculate_ai_dominance_rank(
+                result.ai_visibility_score, 
+                result.competitor_ai_scores
+            )
             
-            # Rate limiting
-            time.sleep(1)
+            emit(f"    📊 AI Visibility Score: {result.ai_visibility_score:.1f}/100")
+            if result.competitor_ai_scores:
+                emit(f"    🏆 AI Dominance Rank: #{result.ai_dominance_rank} among {len(result.competitor_ai_scores) + 1} entities")
+        
+        return result
+    
+    def run_analysis(self, user_input: UserInput) -> List[AIVisibilityResult]:
+        """Main user journey: analyze AI visibility for brand"""
+        analyzer, keywords = self._prepare_analysis(user_input)
+        
+        # Step 3: Analyze each keyword
+        for i, keyword in enumerate(keywords, 1):
+            self.results.append(self._analyze_keyword(analyzer, user_input, i, keyword))
+        
+        # Step 4: Generate summary report
+        self.generate_summary_report(user_input)
+        
+        return self.results
+    
+    async def run_analysis_async(self, user_input: UserInput, max_concurrency: int = 5) -> List[AIVisibilityResult]:
+        """Main user journey with keywords analyzed concurrently (bounded by max_concurrency)"""
+        analyzer, keywords = await asyncio.to_thread(self._prepare_analysis, user_input)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # One task-array POST per engine; keywords missing from a batch are fetched individually
+        print(f"\n📦 Fetching Google and Bing SERPs for {len(keywords)} keywords in batches...")
+        google_batch, bing_batch = await asyncio.gather(*(
+            asyncio.to_thread(
+                self.client.get_serp_batch, engine, keywords,
+                user_input.location, user_input.device, user_input.language
+            )
+            for engine in ("google", "bing")
+        ))
+        
+        async def analyze(i: int, keyword: str) -> AIVisibilityResult:
+            async with semaphore:
+                # Buffer each keyword's progress so concurrent keywords don't interleave
+                lines = []
+                result = await asyncio.to_thread(
+                    self._analyze_keyword, analyzer, user_input, i, keyword, lines.append,
+                    google_batch.get(keyword), bing_batch.get(keyword)
+                )
+                print("\n".join(lines))
+                return result
+        
+        # Step 3: Analyze all keywords concurrently; gather keeps keyword order
+        self.results.extend(await asyncio.gather(*(analyze(i, keyword) for i, keyword in enumerate(keywords, 1))))
         
         # Step 4: Generate summary report
         self.generate_summary_report(user_input)
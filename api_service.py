@@ -3,7 +3,7 @@ AI Visibility Monitor API Service - Optimized Single Endpoint
 FastAPI-based web service with optimized /api/v1/analyze endpoint
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
@@ -156,12 +156,19 @@ async def get_analysis(analysis_id: str):
     return analysis_jobs[analysis_id]
 
 @app.get("/api/v1/analysis/{analysis_id}/status", response_model=AnalysisStatus)
-async def get_analysis_status(analysis_id: str):
-    """Get analysis status by ID"""
+async def get_analysis_status(analysis_id: str, response: Response, if_none_match: Optional[str] = Header(None)):
+    """Get analysis status by ID (answers 304 when the caller's ETag is still current)"""
     if analysis_id not in analysis_jobs:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
     job = analysis_jobs[analysis_id]
+    
+    # Status only changes with job.status / completed_at, so they make a cheap validator
+    etag = f'W/"{job.status}:{job.completed_at or ""}"'
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
     return AnalysisStatus(
         analysis_id=job.analysis_id,
         status=job.status,
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Request coalescing for concurrent identical calls
+Dependency-free so the monitors and the test scripts can share it without side effects
+"""
+
+import threading
+from concurrent.futures import Future
+
+class RequestCoalescer:
+    """Lets concurrent callers asking for the same key share one in-flight call"""
+    
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+    
+    def fetch(self, key, call):
+        """Run call() for key, or wait for the identical call already in flight"""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            result = call()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
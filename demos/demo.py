@@ -4,20 +4,23 @@ Demo script for AI Visibility Monitor
 Tests the system with sample data
 """
 
-from ai_visibility_monitor import UserInput, AIVisibilityMonitor
 import os
+from pathlib import Path
 
-# Load environment variables from .env file if it exists
+# Load environment variables from the project-root .env (where the README creates it), not demos/.env
 def load_env():
-    """Load environment variables from .env file"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+    """Load environment variables from .env file; variables already set win"""
+    try:
+        with open(Path(__file__).resolve().parent.parent / '.env', 'r', encoding='utf-8') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return
+    
+    for line in data.splitlines():
+        line = line.strip()
+        if line and not line.startswith('#') and '=' in line:
+            key, value = line.split('=', 1)
+            os.environ.setdefault(key, value)
 
 load_env()
 
@@ -31,7 +34,7 @@ def demo_run():
     password = os.getenv('DATAFORSEO_PASSWORD', 'demo_password')
     
     # Sample brand data
-    demo_input = UserInput(
+    demo_params = dict(
         brand_name="Nike",
         brand_domain="nike.com",
         competitors=["adidas.com", "puma.com", "underarmour.com"],
@@ -48,13 +51,17 @@ def demo_run():
         language="English"
     )
     
+    # Join display lists once and reuse them
+    competitors_str = ', '.join(demo_params['competitors'])
+    queries_str = ', '.join(demo_params['serp_queries'])
+    
     print(f"📊 Demo Parameters:")
-    print(f"   Brand: {demo_input.brand_name}")
-    print(f"   Domain: {demo_input.brand_domain}")
-    print(f"   Competitors: {', '.join(demo_input.competitors)}")
-    print(f"   Queries: {', '.join(demo_input.serp_queries)}")
-    print(f"   Location: {demo_input.location}")
-    print(f"   Device: {demo_input.device}")
+    print(f"   Brand: {demo_params['brand_name']}")
+    print(f"   Domain: {demo_params['brand_domain']}")
+    print(f"   Competitors: {competitors_str}")
+    print(f"   Queries: {queries_str}")
+    print(f"   Location: {demo_params['location']}")
+    print(f"   Device: {demo_params['device']}")
     
     if login == 'demo_login':
         print("\n⚠️  Using demo credentials - set real credentials with:")
@@ -62,6 +69,11 @@ def demo_run():
         print("   export DATAFORSEO_PASSWORD='your_password'")
         return
     
+    # Deferred so the demo-credentials path skips the monitor's imports
+    from ai_visibility_monitor import UserInput, AIVisibilityMonitor
+    
+    demo_input = UserInput(**demo_params)
+    
     # Run analysis
     monitor = AIVisibilityMonitor(login, password)
     results = monitor.run_analysis(demo_input)
@@ -13,20 +13,20 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 import os
+from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
 # Load environment variables from .env file if it exists
 def load_env():
     """Load environment variables from .env file"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+    env_path = Path(__file__).with_name('.env')
+    if env_path.exists():
+        lines = (line.strip() for line in env_path.read_text().splitlines())
+        os.environ.update(
+            line.split('=', 1) for line in lines
+            if line and not line.startswith('#') and '=' in line
+        )
 
 load_env()
 
@@ -60,6 +60,13 @@ class FastAIVisibilityResult:
     ai_visibility_score: float = 0.0
     processing_time_ms: int = 0
 
+# Ask for compressed responses; brotli is only advertised when a decoder is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
 class FastDataForSEOClient:
     """Optimized DataForSEO client for speed"""
     
@@ -73,6 +80,7 @@ class FastDataForSEOClient:
         self.session.auth = (login, password)
         self.session.headers.update({
             'Content-Type': 'application/json',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive'
         })
         
@@ -96,8 +104,18 @@ class FastDataForSEOClient:
     def get_language_code(self, language: str) -> str:
         return self.language_cache.get(language, "en")
     
-    async def get_serp_data_async(self, keyword: str, location: str, device: str, language: str, engine: str = "google") -> Dict[str, Any]:
-        """Async SERP data fetching for parallel processing"""
+    def open_async_session(self) -> aiohttp.ClientSession:
+        """Pooled aiohttp session so concurrent SERP requests share keep-alive connections"""
+        return aiohttp.ClientSession(
+            auth=aiohttp.BasicAuth(self.login, self.password),
+            headers={'Accept-Encoding': ACCEPT_ENCODING},
+            connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+    
+    async def get_serp_data_async(self, keyword: str, location: str, device: str, language: str, engine: str = "google",
+                                  session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+        """Async SERP data fetching for parallel processing (pass a shared session to reuse connections)"""
         location_code = self.get_location_code(location)
         language_code = self.get_language_code(language)
         
@@ -119,19 +137,22 @@ class FastDataForSEOClient:
                 "device": device
             }]
         
+        owns_session = session is None
+        if owns_session:
+            session = self.open_async_session()
+        
         try:
-            async with aiohttp.ClientSession(
-                auth=aiohttp.BasicAuth(self.login, self.password),
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as session:
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        return {}
+            async with session.post(url, json=payload) as response:
+                if response.status == 200:
+                    return await response.json()
+                else:
+                    return {}
         except Exception as e:
             print(f"Error fetching {engine} SERP for '{keyword}': {e}")
             return {}
+        finally:
+            if owns_session:
+                await session.close()
     
     def get_serp_parallel(self, keywords: List[str], location: str, device: str, language: str) -> Dict[str, Dict[str, Any]]:
         """Get SERP data for multiple keywords in parallel"""
@@ -318,7 +339,7 @@ class FastAIVisibilityMonitor:
     
     def run_fast_analysis(self, user_input: FastUserInput) -> Tuple[List[FastAIVisibilityResult], Dict[str, Any]]:
         """Ultra-fast analysis optimized for SaaS onboarding"""
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         
         print(f"🚀 Fast AI Analysis for {user_input.brand_name}")
         
@@ -328,13 +349,13 @@ class FastAIVisibilityMonitor:
         
         # Step 1: Parallel SERP fetching (biggest speed improvement)
         print(f"⚡ Fetching SERP data for {len(keywords)} keywords in parallel...")
-        serp_start = time.time()
+        serp_start = time.perf_counter_ns()
         
         all_serp_data = self.client.get_serp_parallel(
             keywords, user_input.location, user_input.device, user_input.language
         )
         
-        serp_time = (time.time() - serp_start) * 1000
+        serp_time = (time.perf_counter_ns() - serp_start) / 1_000_000
         print(f"✅ SERP data fetched in {serp_time:.0f}ms")
         
         # Step 2: Fast analysis
@@ -342,36 +363,51 @@ class FastAIVisibilityMonitor:
         analysis_times = []
         
         for keyword in keywords:
-            keyword_start = time.time()
-            
             # Quick analysis
             google_data = all_serp_data.get(keyword, {}).get('google', {})
             bing_data = all_serp_data.get(keyword, {}).get('bing', {})
             
-            google_analysis = analyzer.quick_analyze_google(google_data)
-            bing_analysis = analyzer.quick_analyze_bing(bing_data)
-            
-            # Calculate quick score
-            ai_score = analyzer.calculate_quick_score(google_analysis, bing_analysis)
-            
-            keyword_time = (time.time() - keyword_start) * 1000
+            result, keyword_time = self._analyze_keyword(analyzer, keyword, google_data, bing_data)
             analysis_times.append(keyword_time)
-            
-            result = FastAIVisibilityResult(
-                query=keyword,
-                timestamp=datetime.now().isoformat(),
-                google_ai_overview_present=google_analysis['ai_overview_present'],
-                google_brand_cited=google_analysis['brand_cited'],
-                google_competitor_count=google_analysis['competitor_count'],
-                bing_ai_present=bing_analysis['ai_present'],
-                bing_brand_visible=bing_analysis['brand_visible'],
-                ai_visibility_score=ai_score,
-                processing_time_ms=int(keyword_time)
-            )
-            
             results.append(result)
         
-        total_time = (time.time() - start_time) * 1000
+        total_time = (time.perf_counter_ns() - start_time) / 1_000_000
+        
+        # Generate fast summary
+        summary = self.generate_fast_summary(results, user_input, total_time, analysis_times)
+        
+        print(f"🏁 Analysis completed in {total_time:.0f}ms")
+        
+        return results, summary
+    
+    async def run_fast_analysis_async(self, user_input: FastUserInput) -> Tuple[List[FastAIVisibilityResult], Dict[str, Any]]:
+        """Async fast analysis with one task per keyword so a slow keyword doesn't hold up the others"""
+        start_time = time.perf_counter_ns()
+        
+        print(f"🚀 Fast AI Analysis for {user_input.brand_name}")
+        
+        # Limit keywords for speed (max 5)
+        keywords = user_input.serp_queries[:5]
+        analyzer = FastAIVisibilityAnalyzer(user_input.brand_domain, user_input.competitors)
+        
+        print(f"⚡ Analyzing {len(keywords)} keywords concurrently...")
+        
+        # One pooled session for every keyword's Google and Bing requests
+        async with self.client.open_async_session() as session, asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(self._score_keyword_async(analyzer, keyword, user_input, session))
+                for keyword in keywords
+            ]
+        
+        # Keep results in keyword order regardless of completion order
+        results = []
+        analysis_times = []
+        for task in tasks:
+            result, keyword_time = task.result()
+            results.append(result)
+            analysis_times.append(keyword_time)
+        
+        total_time = (time.perf_counter_ns() - start_time) / 1_000_000
         
         # Generate fast summary
         summary = self.generate_fast_summary(results, user_input, total_time, analysis_times)
@@ -380,6 +416,48 @@ class FastAIVisibilityMonitor:
         
         return results, summary
     
+    async def _score_keyword_async(self, analyzer: 'FastAIVisibilityAnalyzer', keyword: str,
+                                   user_input: FastUserInput,
+                                   session: Optional[aiohttp.ClientSession] = None) -> Tuple[FastAIVisibilityResult, float]:
+        """Fetch Google and Bing SERPs for one keyword concurrently and analyze them"""
+        google_data, bing_data = await asyncio.gather(
+            self.client.get_serp_data_async(
+                keyword, user_input.location, user_input.device, user_input.language, "google", session
+            ),
+            self.client.get_serp_data_async(
+                keyword, user_input.location, user_input.device, user_input.language, "bing", session
+            )
+        )
+        
+        return self._analyze_keyword(analyzer, keyword, google_data, bing_data)
+    
+    def _analyze_keyword(self, analyzer: 'FastAIVisibilityAnalyzer', keyword: str,
+                         google_data: Dict[str, Any], bing_data: Dict[str, Any]) -> Tuple[FastAIVisibilityResult, float]:
+        """Analyze fetched SERP data for one keyword, returning the result and analysis time in ms"""
+        keyword_start = time.perf_counter_ns()
+        
+        google_analysis = analyzer.quick_analyze_google(google_data)
+        bing_analysis = analyzer.quick_analyze_bing(bing_data)
+        
+        # Calculate quick score
+        ai_score = analyzer.calculate_quick_score(google_analysis, bing_analysis)
+        
+        keyword_time = (time.perf_counter_ns() - keyword_start) / 1_000_000
+        
+        result = FastAIVisibilityResult(
+            query=keyword,
+            timestamp=datetime.now().isoformat(),
+            google_ai_overview_present=google_analysis['ai_overview_present'],
+            google_brand_cited=google_analysis['brand_cited'],
+            google_competitor_count=google_analysis['competitor_count'],
+            bing_ai_present=bing_analysis['ai_present'],
+            bing_brand_visible=bing_analysis['brand_visible'],
+            ai_visibility_score=ai_score,
+            processing_time_ms=int(keyword_time)
+        )
+        
+        return result, keyword_time
+    
     def generate_fast_summary(self, results: List[FastAIVisibilityResult], 
                             user_input: FastUserInput, total_time: float, 
                             analysis_times: List[float]) -> Dict[str, Any]:
@@ -0,0 +1,27 @@
+"""
+Shared .env loader for test scripts
+Reads the project .env once per process, however many test modules import it
+"""
+
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+
+# KEY=value lines; comment lines are rejected by the lookahead inside the regex engine
+_ENV_RE = re.compile(r'(?m)^(?!\s*#)\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*?)\s*$')
+
+@lru_cache(maxsize=1)
+def load_env():
+    """Load environment variables from the project .env file"""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        # Minimal fallback when python-dotenv is not installed; existing variables still win
+        if ENV_PATH.exists():
+            for match in _ENV_RE.finditer(ENV_PATH.read_text()):
+                os.environ.setdefault(match.group(1), match.group(2))
+        return
+    load_dotenv(ENV_PATH, override=False)
@@ -0,0 +1,68 @@
+"""
+Local disk cache for DataForSEO responses
+Lets repeated local test runs reuse recent SERPs instead of calling the API
+Set SERP_CACHE_CLEAR=1 to drop cached responses at the start of a pytest run
+"""
+
+import hashlib
+import json
+import shutil
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Optional
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.serp_cache'
+CACHE_TTL = 3600  # 1 hour
+REFERENCE_TTL = 7 * 24 * 3600  # locations/languages change on the order of months
+
+def clear_cache():
+    """Drop every cached response; run once per session, before any worker starts writing"""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+def _cache_path(key_parts) -> Path:
+    """Map JSON-serializable request parts to a cache file"""
+    key = hashlib.sha1(json.dumps(key_parts, sort_keys=True).encode()).hexdigest()
+    return CACHE_DIR / f"{key}.json"
+
+def read_cache(key_parts, ttl: int = CACHE_TTL) -> Optional[str]:
+    """Return the cached response body for key_parts if younger than ttl"""
+    path = _cache_path(key_parts)
+    try:
+        if time.time() - path.stat().st_mtime < ttl:
+            return path.read_text()
+    except FileNotFoundError:
+        pass
+    return None
+
+def write_cache(key_parts, body: str):
+    """Store a successful response body for key_parts"""
+    CACHE_DIR.mkdir(exist_ok=True)
+    _cache_path(key_parts).write_text(body)
+
+def cached_serp(fetch):
+    """Wrap a (keyword, location, device, language) SERP fetch with the disk cache"""
+    @wraps(fetch)
+    def wrapper(keyword: str, location: str, device: str, language: str):
+        key_parts = [fetch.__name__, keyword, location, device, language]
+        
+        body = read_cache(key_parts)
+        if body is not None:
+            return json.loads(body)
+        
+        data = fetch(keyword, location, device, language)
+        
+        # Only cache successful responses; the client returns {} on errors
+        if data:
+            write_cache(key_parts, json.dumps(data))
+        
+        return data
+    
+    return wrapper
+
+def install_serp_cache(client):
+    """Route a DataForSEOClient's Google SERP calls through the disk cache"""
+    # Shared clients may already be wrapped by an earlier test
+    if not hasattr(client.get_google_serp_advanced, '__wrapped__'):
+        client.get_google_serp_advanced = cached_serp(client.get_google_serp_advanced)
+    return client
@@ -0,0 +1,56 @@
+"""
+Local API server bootstrap for the API tests
+Starts api_service at most once per process and polls /health instead of sleeping
+"""
+
+import atexit
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+PORT = 8000
+BASE_URL = f"http://localhost:{PORT}"
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+READY_TIMEOUT = 30.0  # seconds
+READY_POLL_INTERVAL = 0.05  # seconds
+
+_server = None
+
+def is_ready(base_url: str = BASE_URL) -> bool:
+    """Check whether the API answers its health check"""
+    try:
+        return requests.get(f"{base_url}/health", timeout=1).ok
+    except requests.exceptions.RequestException:
+        return False
+
+def wait_until_ready(base_url: str = BASE_URL, timeout: float = READY_TIMEOUT) -> bool:
+    """Poll the health check until it passes or the deadline expires"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_ready(base_url):
+            return True
+        time.sleep(READY_POLL_INTERVAL)
+    return False
+
+def ensure_api_server(base_url: str = BASE_URL) -> bool:
+    """Start api_service unless one is already answering, then wait for it to become ready"""
+    global _server
+    
+    if is_ready(base_url):
+        return True
+    
+    if _server is None:
+        print("⏳ Starting API server...")
+        _server = subprocess.Popen([
+            sys.executable, "-m", "uvicorn",
+            "api_service:app",
+            "--host", "0.0.0.0",
+            "--port", str(PORT)
+        ], cwd=PROJECT_ROOT)
+        atexit.register(_server.terminate)
+    
+    return wait_until_ready(base_url)
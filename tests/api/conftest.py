@@ -0,0 +1,14 @@
+"""
+Shared pytest fixtures for the API service tests
+"""
+
+import pytest
+
+from _server import BASE_URL, ensure_api_server
+
+@pytest.fixture(scope="session")
+def api_server():
+    """Base URL of a running API server, started once per test session if needed"""
+    if not ensure_api_server(BASE_URL):
+        pytest.skip(f"API server did not become ready at {BASE_URL}")
+    return BASE_URL
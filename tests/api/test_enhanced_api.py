@@ -6,70 +6,108 @@ Test the updated API service with Bing PAA and enhanced insights
 
 import requests
 import json
+import sys
 import time
 import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def test_enhanced_api():
+from _server import BASE_URL, ensure_api_server
+
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+    
+    def json_pretty(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+    
+    def json_pretty(obj):
+        return json.dumps(obj, indent=2)
+
+# One keep-alive session for the health check, analysis start and status polling
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+))
+
+# Fields the enhanced API must return, checked with set operations against the response keys
+ENHANCED_FIELDS = frozenset({
+    'people_also_ask_queries',
+    'bing_people_also_ask_queries',
+    'ai_visibility_score',
+    'competitor_ai_scores',
+    'ai_dominance_rank'
+})
+ENHANCED_SUMMARY_FIELDS = frozenset({
+    'ai_visibility_scoring',
+    'people_also_ask_insights',
+    'competitor_analysis'
+})
+
+COMPLETION_BANNER = "\n".join([
+    "\n✅ Enhanced API Service Test Completed!",
+    "🎯 Key Enhancements Tested:",
+    "   ✅ Bing People Also Ask extraction",
+    "   ✅ AI Visibility scoring",
+    "   ✅ Competitor AI analysis",
+    "   ✅ Enhanced summary metrics",
+    "   ✅ Complete API response format"
+])
+
+# Analysis request body, encoded once
+TEST_PAYLOAD = {
+    "brand_name": "Mayo Clinic",
+    "brand_domain": "mayoclinic.org",
+    "competitors": ["webmd.com", "healthline.com"],
+    "serp_queries": ["diabetes symptoms"],
+    "industry": "Healthcare",
+    "location": "United States",
+    "device": "desktop",
+    "language": "English"
+}
+TEST_PAYLOAD_BODY = json_dumps(TEST_PAYLOAD)
+
+def test_enhanced_api(api_server):
     """Test the enhanced API service functionality"""
     
     print("🚀 Testing Enhanced API Service")
     print("================================")
     
-    base_url = "http://localhost:8000"
+    base_url = api_server
     
     # Test 1: Health check
     print("\n1️⃣ Testing health check...")
-    try:
-        response = requests.get(f"{base_url}/health")
-        if response.status_code == 200:
-            print("✅ Health check passed")
-        else:
-            print(f"❌ Health check failed: {response.status_code}")
-            return False
-    except requests.exceptions.ConnectionError:
-        print("❌ Cannot connect to API. Starting server...")
-        # Start the API server in background
-        import subprocess
-        subprocess.Popen([
-            "/workspaces/data4seo-api/.venv/bin/uvicorn", 
-            "api_service:app", 
-            "--host", "0.0.0.0", 
-            "--port", "8000"
-        ], cwd="/workspaces/data4seo-api")
-        
-        print("⏳ Waiting for server to start...")
-        time.sleep(5)
-        
-        # Try health check again
-        try:
-            response = requests.get(f"{base_url}/health")
-            if response.status_code == 200:
-                print("✅ Health check passed after restart")
-            else:
-                print(f"❌ Health check failed: {response.status_code}")
-                return False
-        except:
-            print("❌ Still cannot connect to API")
-            return False
+    response = SESSION.get(f"{base_url}/health")
+    if response.status_code == 200:
+        print("✅ Health check passed")
+    else:
+        print(f"❌ Health check failed: {response.status_code}")
+        return False
     
     # Test 2: Start enhanced analysis
     print("\n2️⃣ Testing enhanced analysis endpoint...")
     
-    test_payload = {
-        "brand_name": "Mayo Clinic",
-        "brand_domain": "mayoclinic.org",
-        "competitors": ["webmd.com", "healthline.com"],
-        "serp_queries": ["diabetes symptoms"],
-        "industry": "Healthcare",
-        "location": "United States",
-        "device": "desktop",
-        "language": "English"
-    }
-    
-    response = requests.post(f"{base_url}/api/v1/analyze", json=test_payload)
+    response = SESSION.post(
+        f"{base_url}/api/v1/analyze",
+        data=TEST_PAYLOAD_BODY,
+        headers={'Content-Type': 'application/json'}
+    )
     
     if response.status_code == 200:
-        analysis_data = response.json()
+        analysis_data = json_loads(response.content)
         analysis_id = analysis_data.get('analysis_id')
         print(f"✅ Analysis started successfully")
         print(f"   Analysis ID: {analysis_id}")
@@ -80,88 +118,86 @@ def test_enhanced_api():
         max_wait = 300  # 5 minutes max
         wait_time = 0
         
+        # Exponential backoff (1, 2, 4, ... capped at 30s); unchanged status comes back as a bodiless 304
+        status_url = f"{base_url}/api/v1/analysis/{analysis_id}/status"
+        delay = 1
+        etag = None
+        status = None
+        polls = 0
+        
+        # Polls stay quiet; one summary line is printed once polling stops
         while wait_time < max_wait:
-            time.sleep(10)
-            wait_time += 10
+            time.sleep(delay)
+            wait_time += delay
+            delay = min(delay * 2, 30)
+            polls += 1
             
-            status_response = requests.get(f"{base_url}/api/v1/analysis/{analysis_id}/status")
-            if status_response.status_code == 200:
-                status_data = status_response.json()
-                print(f"   Status: {status_data.get('status')} (waited {wait_time}s)")
+            status_response = SESSION.get(status_url, headers={"If-None-Match": etag} if etag else None)
+            if status_response.status_code == 304:
+                continue
+            elif status_response.status_code == 200:
+                etag = status_response.headers.get("ETag")
+                status = json_loads(status_response.content).get('status')
                 
-                if status_data.get('status') in ['completed', 'failed']:
+                if status in ['completed', 'failed']:
                     break
             else:
                 print(f"❌ Status check failed: {status_response.status_code}")
                 break
         
-        # Test 4: Get enhanced results
-        print("\n4️⃣ Testing enhanced results retrieval...")
-        results_response = requests.get(f"{base_url}/api/v1/analysis/{analysis_id}")
+        print(f"   Status: {status} (waited {wait_time}s, {polls} polls)")
+        
+        # Test 4: Get enhanced results (report buffered into one write)
+        lines = ["\n4️⃣ Testing enhanced results retrieval..."]
+        results_response = SESSION.get(f"{base_url}/api/v1/analysis/{analysis_id}")
         
         if results_response.status_code == 200:
-            results_data = results_response.json()
-            print("✅ Enhanced results retrieved successfully")
+            results_data = json_loads(results_response.content)
+            lines.append("✅ Enhanced results retrieved successfully")
             
             # Validate enhanced fields
             if results_data.get('results'):
                 result = results_data['results'][0]
-                enhanced_fields = [
-                    'people_also_ask_queries',
-                    'bing_people_also_ask_queries', 
-                    'ai_visibility_score',
-                    'competitor_ai_scores',
-                    'ai_dominance_rank'
-                ]
                 
-                print("📊 Enhanced Fields Validation:")
-                for field in enhanced_fields:
-                    if field in result:
-                        value = result[field]
-                        print(f"   ✅ {field}: {type(value).__name__} - {value}")
-                    else:
-                        print(f"   ❌ {field}: Missing")
+                lines.append("📊 Enhanced Fields Validation:")
+                for field in sorted(ENHANCED_FIELDS & result.keys()):
+                    value = result[field]
+                    lines.append(f"   ✅ {field}: {type(value).__name__} - {value}")
+                lines.extend(f"   ❌ {field}: Missing" for field in sorted(ENHANCED_FIELDS - result.keys()))
             
             # Validate enhanced summary
             if results_data.get('summary'):
                 summary = results_data['summary']
-                enhanced_summary_fields = [
-                    'ai_visibility_scoring',
-                    'people_also_ask_insights',
-                    'competitor_analysis'
-                ]
                 
-                print("📈 Enhanced Summary Validation:")
-                for field in enhanced_summary_fields:
-                    if field in summary:
-                        print(f"   ✅ {field}: Present")
-                        if field == 'people_also_ask_insights':
-                            paa_data = summary[field]
-                            print(f"      Google PAA: {paa_data.get('google_paa', {}).get('total_questions', 0)} questions")
-                            print(f"      Bing PAA: {paa_data.get('bing_paa', {}).get('total_questions', 0)} questions")
-                    else:
-                        print(f"   ❌ {field}: Missing")
+                lines.append("📈 Enhanced Summary Validation:")
+                for field in sorted(ENHANCED_SUMMARY_FIELDS & summary.keys()):
+                    lines.append(f"   ✅ {field}: Present")
+                    if field == 'people_also_ask_insights':
+                        paa_data = summary[field]
+                        lines.append(f"      Google PAA: {paa_data.get('google_paa', {}).get('total_questions', 0)} questions")
+                        lines.append(f"      Bing PAA: {paa_data.get('bing_paa', {}).get('total_questions', 0)} questions")
+                lines.extend(f"   ❌ {field}: Missing" for field in sorted(ENHANCED_SUMMARY_FIELDS - summary.keys()))
             
-            print("\n📋 Sample Enhanced Response:")
-            print("=" * 40)
-            print(json.dumps(results_data, indent=2)[:1000] + "..." if len(json.dumps(results_data)) > 1000 else json.dumps(results_data, indent=2))
+            lines.append("\n📋 Sample Enhanced Response:")
+            lines.append("=" * 40)
+            pretty = json_pretty(results_data)
+            lines.append(pretty[:1000] + "..." if len(pretty) > 1000 else pretty)
             
         else:
-            print(f"❌ Results retrieval failed: {results_response.status_code}")
+            lines.append(f"❌ Results retrieval failed: {results_response.status_code}")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
             
     else:
         print(f"❌ Analysis start failed: {response.status_code}")
         if response.status_code == 500:
-            error_data = response.json()
+            error_data = json_loads(response.content)
             print(f"   Error: {error_data.get('detail')}")
     
-    print("\n✅ Enhanced API Service Test Completed!")
-    print("🎯 Key Enhancements Tested:")
-    print("   ✅ Bing People Also Ask extraction")
-    print("   ✅ AI Visibility scoring")
-    print("   ✅ Competitor AI analysis")
-    print("   ✅ Enhanced summary metrics")
-    print("   ✅ Complete API response format")
+    print(COMPLETION_BANNER)
 
 if __name__ == "__main__":
-    test_enhanced_api()
+    if ensure_api_server(BASE_URL):
+        test_enhanced_api(BASE_URL)
+    else:
+        print("❌ Cannot connect to API")
@@ -0,0 +1,69 @@
+"""
+Shared pytest fixtures for the AI Visibility Monitor tests
+The quick tests are independent and network-bound, so they can run in parallel:
+    pytest tests/ -n auto --dist=loadfile
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+# Minimum spacing between DataForSEO-backed test starts across all xdist workers
+API_MIN_INTERVAL = 0.5
+
+class StartPacer:
+    """Spaces out DataForSEO-backed test starts so parallel runs stay within rate limits"""
+    
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._last_start = 0.0
+    
+    def wait(self):
+        """Block until the next test start is allowed"""
+        with self._lock:
+            delay = self._last_start + self.min_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._last_start = time.monotonic()
+
+# Each xdist worker paces itself, so the per-worker interval is scaled to cap the combined start rate
+_PACER = StartPacer(API_MIN_INTERVAL * int(os.environ.get('PYTEST_XDIST_WORKER_COUNT', '1')))
+
+def pytest_configure(config):
+    """Register the dataforseo marker"""
+    config.addinivalue_line("markers", "dataforseo: test calls the DataForSEO API and is paced between starts")
+
+def pytest_sessionstart(session):
+    """Honor SERP_CACHE_CLEAR once, on the controller, so xdist workers never delete each other's writes"""
+    if os.getenv('SERP_CACHE_CLEAR') and not hasattr(session.config, 'workerinput'):
+        from _serp_cache import clear_cache
+        clear_cache()
+
+def pytest_collection_modifyitems(config, items):
+    """Skip tests from modules whose module-level DataForSEO credentials are unset"""
+    skip_no_creds = pytest.mark.skip(reason="DataForSEO credentials not set")
+    for item in items:
+        if not hasattr(item.module, 'LOGIN'):
+            continue
+        if not (item.module.LOGIN and item.module.PASSWORD):
+            item.add_marker(skip_no_creds)
+
+@pytest.fixture(scope="session")
+def _session_monitor():
+    """One AIVisibilityMonitor (and HTTP session) for the whole test run"""
+    from ai_visibility_monitor import AIVisibilityMonitor
+    return AIVisibilityMonitor(os.environ['DATAFORSEO_LOGIN'], os.environ['DATAFORSEO_PASSWORD'])
+
+@pytest.fixture
+def monitor(_session_monitor):
+    """Shared AIVisibilityMonitor with results from earlier tests cleared"""
+    _session_monitor.results = []
+    return _session_monitor
+
+def pytest_runtest_setup(item):
+    """Pace the start of tests from modules marked dataforseo; other tests start immediately"""
+    if item.get_closest_marker('dataforseo'):
+        _PACER.wait()
@@ -5,8 +5,11 @@ Test the new Bing PAA extraction functionality
 """
 
 import os
+import pytest
 from ai_visibility_monitor import AIVisibilityMonitor, UserInput
 
+pytestmark = pytest.mark.dataforseo
+
 def test_bing_paa():
     """Test Bing People Also Ask extraction"""
     
@@ -5,7 +5,17 @@ Test People Also Ask extraction and competitor AI visibility scoring
 """
 
 import os
-from ai_visibility_monitor import AIVisibilityMonitor, UserInput
+import sys
+import pytest
+from pathlib import Path
+
+# tests/ holds the shared _env loader; pytest adds it to sys.path through conftest, a direct run does not
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _env import load_env
+
+load_env()
+
+pytestmark = pytest.mark.dataforseo
 
 def test_enhanced_insights():
     """Test the enhanced insights functionality"""
@@ -22,6 +32,9 @@ def test_enhanced_insights():
         print("Set DATAFORSEO_LOGIN and DATAFORSEO_PASSWORD environment variables")
         return
     
+    # Deferred so the missing-credentials path skips the monitor's imports
+    from ai_visibility_monitor import AIVisibilityMonitor, UserInput
+    
     # Test with healthcare scenario (known to have AI Overviews and PAA)
     user_input = UserInput(
         brand_name="Mayo Clinic",
@@ -34,10 +47,14 @@ def test_enhanced_insights():
         language="English"
     )
     
+    # Join display lists once and reuse them
+    competitors_str = ', '.join(user_input.competitors)
+    queries_str = ', '.join(user_input.serp_queries)
+    
     print(f"🏥 Testing Healthcare Scenario:")
     print(f"Brand: {user_input.brand_name}")
-    print(f"Competitors: {', '.join(user_input.competitors)}")
-    print(f"Keywords: {', '.join(user_input.serp_queries)}")
+    print(f"Competitors: {competitors_str}")
+    print(f"Keywords: {queries_str}")
     
     # Run analysis
     monitor = AIVisibilityMonitor(login, password)
@@ -7,29 +7,27 @@ Demonstrates real performance improvements with actual DataForSEO API calls
 
 import time
 import os
+import sys
 import json
 from datetime import datetime
 from typing import Dict, List
 import threading
+import pytest
+from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import both versions for comparison
 from fast_ai_visibility_monitor import FastAIVisibilityMonitor, FastUserInput, run_saas_analysis
 from ai_visibility_monitor import AIVisibilityMonitor, UserInput
 
-def load_env():
-    """Load environment variables from .env file"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+# tests/ holds the shared _env loader; pytest adds it to sys.path through conftest, a direct run does not
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _env import load_env
 
 load_env()
 
+pytestmark = pytest.mark.dataforseo
+
 class PerformanceTestRunner:
     """Comprehensive performance testing suite"""
     
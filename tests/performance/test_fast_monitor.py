@@ -4,9 +4,42 @@ Quick test of the fast AI visibility monitor
 Demonstrates the speed improvements without running full API services
 """
 
+import asyncio
+import sys
 import time
 import os
-from fast_ai_visibility_monitor import FastAIVisibilityMonitor, FastUserInput
+import pytest
+from pathlib import Path
+from operator import attrgetter
+
+# tests/ holds the shared _env loader; pytest adds it to sys.path through conftest, a direct run does not
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _env import load_env
+
+load_env()
+
+pytestmark = pytest.mark.dataforseo
+
+# Fields printed for each keyword result, fetched in one call
+RESULT_FIELDS = attrgetter(
+    'query',
+    'ai_visibility_score',
+    'google_ai_overview_present',
+    'google_brand_cited',
+    'bing_ai_present',
+    'processing_time_ms'
+)
+
+# Per-keyword status markers: pre-encoded emoji on UTF-8 terminals, ASCII otherwise
+_UTF8_TTY = sys.stdout.isatty() and (sys.stdout.encoding or '').lower().replace('-', '') == 'utf8'
+_OK = "✅".encode('utf-8') if _UTF8_TTY else b"[OK]"
+_NO = "❌".encode('utf-8') if _UTF8_TTY else b"[FAIL]"
+
+def write_lines(lines):
+    """Write a block of byte lines to stdout in a single call"""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(b'\n'.join(lines) + b'\n')
+    sys.stdout.buffer.flush()
 
 def test_fast_monitor():
     """Test the fast monitor directly"""
@@ -22,6 +55,9 @@ def test_fast_monitor():
         print("💡 Make sure you have DATAFORSEO_LOGIN and DATAFORSEO_PASSWORD set")
         return
     
+    # Deferred so the missing-credentials path skips the monitor's imports
+    from fast_ai_visibility_monitor import FastAIVisibilityMonitor, FastUserInput
+    
     # Create test input
     user_input = FastUserInput(
         brand_name="Nike",
@@ -42,11 +78,11 @@ def test_fast_monitor():
     try:
         monitor = FastAIVisibilityMonitor(login, password)
         
-        start_time = time.time()
-        results, summary = monitor.run_fast_analysis(user_input)
-        end_time = time.time()
+        start_time = time.perf_counter_ns()
+        results, summary = asyncio.run(monitor.run_fast_analysis_async(user_input))
+        end_time = time.perf_counter_ns()
         
-        total_time = (end_time - start_time) * 1000
+        total_time = (end_time - start_time) / 1_000_000
         
         print(f"\n✅ Fast Analysis Completed!")
         print(f"📊 Performance Results:")
@@ -54,19 +90,28 @@ def test_fast_monitor():
         print(f"   - Keywords Analyzed: {len(results)}")
         print(f"   - Average Time per Keyword: {total_time/len(results):.0f}ms")
         
+        # Resolve nested summary values once
+        ai_visibility = summary['ai_visibility']
+        overall_score = ai_visibility['overall_score']
+        ai_overview_pct = ai_visibility['ai_overview_presence']['percentage']
+        brand_citation_pct = ai_visibility['brand_citations']['percentage']
+        
         print(f"\n📈 AI Visibility Results:")
-        print(f"   - Overall AI Score: {summary['ai_visibility']['overall_score']}/100")
-        print(f"   - AI Overview Presence: {summary['ai_visibility']['ai_overview_presence']['percentage']}%")
-        print(f"   - Brand Citation Rate: {summary['ai_visibility']['brand_citations']['percentage']}%")
+        print(f"   - Overall AI Score: {overall_score}/100")
+        print(f"   - AI Overview Presence: {ai_overview_pct}%")
+        print(f"   - Brand Citation Rate: {brand_citation_pct}%")
         
         print(f"\n🎯 Individual Keyword Results:")
+        keyword_lines = []
         for i, result in enumerate(results, 1):
-            print(f"   {i}. '{result.query}':")
-            print(f"      - AI Score: {result.ai_visibility_score:.1f}/100")
-            print(f"      - Google AI Overview: {'✅' if result.google_ai_overview_present else '❌'}")
-            print(f"      - Brand Cited: {'✅' if result.google_brand_cited else '❌'}")
-            print(f"      - Bing AI Features: {'✅' if result.bing_ai_present else '❌'}")
-            print(f"      - Processing Time: {result.processing_time_ms}ms")
+            query, score, ai_overview, brand_cited, bing_ai, processing_ms = RESULT_FIELDS(result)
+            keyword_lines.append(f"   {i}. '{query}':".encode('utf-8'))
+            keyword_lines.append(f"      - AI Score: {score:.1f}/100".encode('utf-8'))
+            keyword_lines.append(b"      - Google AI Overview: " + (_OK if ai_overview else _NO))
+            keyword_lines.append(b"      - Brand Cited: " + (_OK if brand_cited else _NO))
+            keyword_lines.append(b"      - Bing AI Features: " + (_OK if bing_ai else _NO))
+            keyword_lines.append(f"      - Processing Time: {processing_ms}ms".encode('utf-8'))
+        write_lines(keyword_lines)
         
         print(f"\n💡 Key Recommendations:")
         for i, rec in enumerate(summary['recommendations'], 1):
@@ -5,10 +5,15 @@ Demonstrates speed improvements of the fast API vs standard API
 """
 
 import time
+import socket
 import requests
 import json
 from datetime import datetime
 import os
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 
 # Test configuration
 TEST_BRAND = "Nike"
@@ -16,6 +21,26 @@ TEST_DOMAIN = "nike.com"
 TEST_COMPETITORS = ["adidas.com", "puma.com"]
 TEST_KEYWORDS = ["running shoes", "athletic wear", "sportswear"]
 
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that enables TCP keep-alive on pooled sockets"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        # Keep idle connections alive across the 5s status poll gap
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+# Shared session so every call reuses pooled keep-alive connections
+SESSION = requests.Session()
+_adapter = KeepAliveAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
 def test_fast_api(port=8001):
     """Test the fast API service"""
     print("🚀 Testing Fast API Service")
@@ -30,15 +55,15 @@ def test_fast_api(port=8001):
         "main_competitors": TEST_COMPETITORS
     }
     
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     
     try:
-        response = requests.post(url, json=payload, timeout=60)
-        end_time = time.time()
+        response = SESSION.post(url, json=payload, timeout=60)
+        end_time = time.perf_counter_ns()
         
         if response.status_code == 200:
             result = response.json()
-            total_time = (end_time - start_time) * 1000
+            total_time = (end_time - start_time) / 1_000_000
             
             print(f"✅ Fast API Success!")
             print(f"📊 Results:")
@@ -86,11 +111,11 @@ def test_standard_api(port=8000):
         "language": "English"
     }
     
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     
     try:
         # Submit analysis
-        response = requests.post(url, json=payload, timeout=30)
+        response = SESSION.post(url, json=payload, timeout=30)
         
         if response.status_code != 200:
             print(f"❌ Standard API Error: {response.status_code}")
@@ -105,7 +130,7 @@ def test_standard_api(port=8000):
         status_url = f"http://localhost:{port}/api/v1/analysis/{analysis_id}"
         
         while True:
-            status_response = requests.get(status_url, timeout=30)
+            status_response = SESSION.get(status_url, timeout=30)
             
             if status_response.status_code != 200:
                 print(f"❌ Status check error: {status_response.status_code}")
@@ -114,8 +139,8 @@ def test_standard_api(port=8000):
             status_data = status_response.json()
             
             if status_data['status'] == 'completed':
-                end_time = time.time()
-                total_time = (end_time - start_time) * 1000
+                end_time = time.perf_counter_ns()
+                total_time = (end_time - start_time) / 1_000_000
                 
                 print(f"✅ Standard API Success!")
                 print(f"📊 Results:")
@@ -140,7 +165,7 @@ def test_standard_api(port=8000):
                 return {"success": False, "error": "Analysis failed"}
             
             elif status_data['status'] in ['pending', 'running']:
-                elapsed = (time.time() - start_time)
+                elapsed = (time.perf_counter_ns() - start_time) / 1_000_000_000
                 print(f"⏳ Status: {status_data['status']} (elapsed: {elapsed:.1f}s)")
                 time.sleep(5)  # Wait 5 seconds before next check
                 
@@ -163,9 +188,14 @@ def test_fast_api_features():
     
     base_url = "http://localhost:8001"
     
+    # Issue both probes concurrently over the shared connection pool
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        metrics_future = executor.submit(SESSION.get, f"{base_url}/api/v2/performance-metrics", timeout=10)
+        demo_future = executor.submit(SESSION.get, f"{base_url}/api/v2/onboarding-demo", timeout=10)
+    
     # Test performance metrics
     try:
-        metrics_response = requests.get(f"{base_url}/api/v2/performance-metrics", timeout=10)
+        metrics_response = metrics_future.result()
         if metrics_response.status_code == 200:
             metrics = metrics_response.json()
             print(f"📈 Performance Metrics:")
@@ -178,7 +208,7 @@ def test_fast_api_features():
     
     # Test demo endpoint
     try:
-        demo_response = requests.get(f"{base_url}/api/v2/onboarding-demo", timeout=10)
+        demo_response = demo_future.result()
         if demo_response.status_code == 200:
             demo = demo_response.json()
             print(f"\n🎯 Demo Analysis:")
@@ -7,25 +7,23 @@ Focuses on demonstrating real performance improvements
 
 import time
 import os
+import sys
+import pytest
+from pathlib import Path
 from datetime import datetime
 from typing import Dict
 
 # Import the optimized fast monitor
 from fast_ai_visibility_monitor import run_saas_analysis
 
-def load_env():
-    """Load environment variables from .env file"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+# tests/ holds the shared _env loader; pytest adds it to sys.path through conftest, a direct run does not
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _env import load_env
 
 load_env()
 
+pytestmark = pytest.mark.dataforseo
+
 def test_fast_analysis_performance():
     """Test the fast analysis performance with real API calls"""
     print("🚀 Testing Fast AI Visibility Analysis Performance")
@@ -5,33 +5,23 @@ Quick test with minimal keywords to verify fixes
 
 from ai_visibility_monitor import UserInput, AIVisibilityMonitor
 import os
+import pytest
 
-# Load environment variables from .env file if it exists
-def load_env():
-    """Load environment variables from .env file"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+from _env import load_env
+from _serp_cache import install_serp_cache
 
 load_env()
 
-def quick_test():
+LOGIN = os.getenv('DATAFORSEO_LOGIN')
+PASSWORD = os.getenv('DATAFORSEO_PASSWORD')
+
+pytestmark = pytest.mark.dataforseo
+
+def test_quick_ai(monitor):
     """Quick test with just 1 keyword"""
     print("🚀 Quick AI Visibility Test")
     print("===========================")
     
-    login = os.getenv('DATAFORSEO_LOGIN')
-    password = os.getenv('DATAFORSEO_PASSWORD')
-    
-    if not login or not password:
-        print("❌ No credentials found")
-        return
-    
     test_input = UserInput(
         brand_name="Nike",
         brand_domain="nike.com", 
@@ -42,10 +32,13 @@ def quick_test():
         device="desktop"
     )
     
-    monitor = AIVisibilityMonitor(login, password)
+    install_serp_cache(monitor.client)
     results = monitor.run_analysis(test_input)
     
     print(f"\n✅ Test complete! Results: {len(results)} keywords analyzed")
 
 if __name__ == "__main__":
-    quick_test()
+    if not LOGIN or not PASSWORD:
+        print("❌ No credentials found")
+    else:
+        test_quick_ai(AIVisibilityMonitor(LOGIN, PASSWORD))
@@ -5,22 +5,24 @@ Test the enhanced functionality with a simple query
 """
 
 import os
+import pytest
 from ai_visibility_monitor import AIVisibilityMonitor, UserInput
+from _env import load_env
+from _serp_cache import install_serp_cache
 
-def quick_enhanced_test():
+load_env()
+
+LOGIN = os.getenv('DATAFORSEO_LOGIN')
+PASSWORD = os.getenv('DATAFORSEO_PASSWORD')
+
+pytestmark = pytest.mark.dataforseo
+
+def test_quick_enhanced(monitor):
     """Quick test of enhanced functionality"""
     
     print("🚀 Quick Test: Enhanced AI Visibility Monitor")
     print("==============================================")
     
-    # Load credentials
-    login = os.getenv('DATAFORSEO_LOGIN')
-    password = os.getenv('DATAFORSEO_PASSWORD')
-    
-    if not login or not password:
-        print("❌ DataForSEO credentials not found")
-        return
-    
     # Test with a single healthcare query
     user_input = UserInput(
         brand_name="Mayo Clinic",
@@ -39,7 +41,7 @@ def quick_enhanced_test():
     print(f"   Competitors: {', '.join(user_input.competitors)}")
     
     # Run analysis
-    monitor = AIVisibilityMonitor(login, password)
+    install_serp_cache(monitor.client)
     results = monitor.run_analysis(user_input)
     
     # Export results
@@ -54,4 +56,7 @@ def quick_enhanced_test():
     print("   ✅ Enhanced summary reporting")
 
 if __name__ == "__main__":
-    quick_enhanced_test()
+    if not LOGIN or not PASSWORD:
+        print("❌ DataForSEO credentials not found")
+    else:
+        test_quick_enhanced(AIVisibilityMonitor(LOGIN, PASSWORD))
@@ -6,26 +6,43 @@ Quick test script for DataForSEO API integration
 import requests
 import json
 import os
+import pytest
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Load environment variables from .env file if it exists
-def load_env():
-    """Load environment variables from .env file"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+from _env import load_env
 
 load_env()
 
+LOGIN = os.getenv('DATAFORSEO_LOGIN')
+PASSWORD = os.getenv('DATAFORSEO_PASSWORD')
+
+pytestmark = pytest.mark.dataforseo
+
+# Reused session so repeated calls share pooled keep-alive connections
+_SESSION = requests.Session()
+_SESSION.headers.update({'Content-Type': 'application/json'})
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[429],
+        allowed_methods=frozenset({'GET', 'POST'}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+))
+
 def test_dataforseo_connection():
     """Test DataForSEO API connection"""
-    login = os.getenv('DATAFORSEO_LOGIN', 'test_login')
-    password = os.getenv('DATAFORSEO_PASSWORD', 'test_password')
-    
     # Test Google SERP Live Advanced
     url = "https://api.dataforseo.com/v3/serp/google/organic/live/advanced"
     
@@ -36,29 +53,27 @@ def test_dataforseo_connection():
         "device": "desktop"
     }]
     
+    _SESSION.auth = (LOGIN or 'test_login', PASSWORD or 'test_password')
+    
     try:
-        response = requests.post(
-            url,
-            auth=(login, password),
-            headers={'Content-Type': 'application/json'},
-            json=payload
-        )
+        response = _SESSION.post(url, json=payload, timeout=30)
         
         print(f"Status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_loads(response.content)
             print("✅ Connection successful!")
             
             # Check for AI Overview
             if data.get('tasks') and data['tasks'][0].get('result'):
                 items = data['tasks'][0]['result'][0].get('items', [])
-                ai_overview_found = any(item.get('type') == 'ai_overview' for item in items)
+                # Collect SERP feature types in a single pass
+                feature_types = {item.get('type') for item in items}
+                ai_overview_found = 'ai_overview' in feature_types
                 print(f"🤖 AI Overview found: {ai_overview_found}")
                 
                 # Print SERP feature types
-                feature_types = [item.get('type') for item in items]
-                print(f"📊 SERP features: {set(feature_types)}")
+                print(f"📊 SERP features: {feature_types}")
             
         elif response.status_code == 401:
             print("❌ Authentication failed - check credentials")
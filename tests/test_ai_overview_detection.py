@@ -3,26 +3,57 @@
 Test AI Overview Detection with Keywords Known to Trigger AI Overviews
 """
 
+import os
 import sys
-import time
+import json
+import asyncio
+import aiohttp
+import pytest
+from itertools import islice
 from ai_visibility_monitor import AIVisibilityMonitor, AIVisibilityAnalyzer
 
-def test_ai_overview_detection():
-    """Test with keywords that should trigger AI Overviews"""
+from _env import load_env
+
+load_env()
+
+LOGIN = os.getenv('DATAFORSEO_LOGIN')
+PASSWORD = os.getenv('DATAFORSEO_PASSWORD')
+
+pytestmark = pytest.mark.dataforseo
+
+async def fetch_serps_batch(client, keywords):
+    """Fetch Google SERP data for all keywords in a single task-array POST"""
+    url = f"{client.base_url}/serp/google/organic/live/advanced"
+    payload = [{
+        "keyword": keyword,
+        "location_code": client.get_location_code("United States"),
+        "language_code": client.get_language_code("English"),
+        "device": "desktop",
+        "os": "windows"
+    } for keyword in keywords]
     
-    # Load credentials
-    import os
-    from dotenv import load_dotenv
+    async with aiohttp.ClientSession(
+        auth=aiohttp.BasicAuth(client.login, client.password),
+        timeout=aiohttp.ClientTimeout(total=60)
+    ) as session:
+        async with session.post(url, json=payload) as response:
+            response.raise_for_status()
+            raw = await response.read()
     
-    load_dotenv()
+    # No AI Overview anywhere in the batch: skip decoding and item walks entirely
+    if b'"ai_overview"' not in raw:
+        return {}
     
-    # Get credentials
-    login = os.getenv('DATAFORSEO_LOGIN')
-    password = os.getenv('DATAFORSEO_PASSWORD')
+    data = json.loads(raw)
     
-    if not login or not password:
-        print("❌ Missing credentials! Please set DATAFORSEO_LOGIN and DATAFORSEO_PASSWORD in .env file")
-        return
+    # Split tasks back out per keyword in the single-task shape the analyzer expects
+    return {
+        task.get('data', {}).get('keyword'): {'tasks': [task]}
+        for task in data.get('tasks') or []
+    }
+
+def test_ai_overview_detection(monitor):
+    """Test with keywords that should trigger AI Overviews"""
     
     # Keywords that typically trigger AI Overviews (informational queries)
     test_keywords = [
@@ -36,43 +67,42 @@ def test_ai_overview_detection():
     print("🧪 Testing AI Overview Detection")
     print("=" * 50)
     
-    monitor = AIVisibilityMonitor(login, password)
-    
     # Configure test parameters
     monitor.brand_domain = "wikipedia.org"  # Use a domain likely to be cited
     monitor.competitor_domains = ["britannica.com", "healthline.com", "mayoclinic.com"]
     
+    # Get SERP data for every keyword in one batched request
+    try:
+        serp_by_keyword = asyncio.run(fetch_serps_batch(monitor.client, test_keywords))
+    except Exception as e:
+        print(f"💥 Error fetching SERP data: {e}")
+        return
+    
+    # One analyzer for all keywords
+    analyzer = AIVisibilityAnalyzer("wikipedia.org", ["britannica.com", "healthline.com"])
+    
     for keyword in test_keywords:
         print(f"\n📈 Testing: '{keyword}'")
         print("-" * 40)
         
         try:
-            # Get SERP data
-            serp_data = monitor.client.get_google_serp_advanced(
-                keyword=keyword,
-                location="United States", 
-                device="desktop",
-                language="English"
-            )
+            serp_data = serp_by_keyword.get(keyword, {})
             
             # Analyze for AI Overview
-            analyzer = AIVisibilityAnalyzer("wikipedia.org", ["britannica.com", "healthline.com"])
             analysis = analyzer.analyze_google_serp(serp_data)
             
             if analysis['ai_overview_present']:
                 print(f"  ✅ AI Overview detected!")
                 print(f"  📊 Citations found: {len(analysis['ai_citations'])}")
-                if analysis['ai_citations']:
-                    print(f"  🔗 Cited domains: {', '.join(analysis['ai_citations'][:5])}")  # Show first 5
+                first_citations = list(islice(analyzer.iter_ai_citations(serp_data), 5))
+                if first_citations:
+                    print(f"  🔗 Cited domains: {', '.join(first_citations)}")  # Show first 5
                 if analysis['brand_cited']:
                     print(f"  🎯 Brand cited: YES")
                 else:
                     print(f"  ❌ Brand not cited")
             else:
                 print(f"  ❌ No AI Overview found")
-                
-            # Add delay to respect rate limits
-            time.sleep(1)
             
         except Exception as e:
             print(f"  💥 Error: {e}")
@@ -80,4 +110,7 @@ def test_ai_overview_detection():
     print(f"\n🏁 Test completed!")
 
 if __name__ == "__main__":
-    test_ai_overview_detection()
+    if not LOGIN or not PASSWORD:
+        print("❌ Missing credentials! Please set DATAFORSEO_LOGIN and DATAFORSEO_PASSWORD in .env file")
+    else:
+        test_ai_overview_detection(AIVisibilityMonitor(LOGIN, PASSWORD))
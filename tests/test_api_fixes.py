@@ -3,24 +3,102 @@
 Test script to verify DataForSEO API fixes
 """
 
-import requests
+import asyncio
 import json
 import os
+import sys
 
-# Load environment variables from .env file if it exists
-def load_env():
-    """Load environment variables from .env file"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+import aiohttp
+import pytest
+
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+
+from ai_visibility_monitor import ACCEPT_ENCODING
+
+from _env import load_env
+from _serp_cache import CACHE_TTL, REFERENCE_TTL, read_cache, write_cache
 
 load_env()
 
+pytestmark = pytest.mark.dataforseo
+
+BASE_URL = "https://api.dataforseo.com/v3"
+
+# Below this account balance (USD) the paid endpoints would only return 402s
+MIN_BALANCE = 0.1
+
+# Sent as one task-array POST; results are matched back by task keyword
+SERP_KEYWORDS = ["AI search", "what is generative AI"]
+
+# Request bodies are encoded once and reused by every call and cache lookup
+SERP_BODY = json_dumps([{
+    "keyword": keyword,
+    "location_code": 2840,  # United States
+    "language_code": "en",  # English
+    "device": "desktop"
+} for keyword in SERP_KEYWORDS])
+KEYWORDS_FOR_SITE_BODY = json_dumps([{
+    "target": "nike.com",
+    "location_code": 2840,  # United States
+    "language_code": "en",  # English
+    "limit": 10
+}])
+
+async def fetch_endpoints(login, password):
+    """Check the account balance, then call all tested endpoints concurrently over one pooled aiohttp session"""
+    async with aiohttp.ClientSession(
+        auth=aiohttp.BasicAuth(login, password),
+        connector=aiohttp.TCPConnector(limit=8, ttl_dns_cache=300),
+        headers={'Content-Type': 'application/json', 'Accept-Encoding': ACCEPT_ENCODING}
+    ) as session:
+        async def fetch(method, path, data=None, ttl=CACHE_TTL):
+            # Recent successful responses are served from the local disk cache
+            key_parts = [method, path, data.decode() if data else None]
+            body = read_cache(key_parts, ttl)
+            if body is not None:
+                return 200, body
+            
+            async with session.request(method, f"{BASE_URL}{path}", data=data) as response:
+                body = await response.text()
+                if response.status == 200:
+                    write_cache(key_parts, body)
+                return response.status, body
+        
+        # Fail fast on an empty account instead of burning four requests on 402s
+        async with session.get(f"{BASE_URL}/appendix/user_data") as response:
+            user_data = json_loads(await response.read()) if response.status == 200 else {}
+        user_result = ((user_data.get('tasks') or [{}])[0].get('result') or [{}])[0]
+        balance = (user_result.get('money') or {}).get('balance')
+        if balance is not None and balance < MIN_BALANCE:
+            return balance, None
+        
+        return balance, await asyncio.gather(
+            fetch('GET', '/serp/google/locations', ttl=REFERENCE_TTL),
+            fetch('GET', '/serp/google/languages', ttl=REFERENCE_TTL),
+            fetch('POST', '/serp/google/organic/live/advanced', SERP_BODY),
+            fetch('POST', '/dataforseo_labs/google/keywords_for_site/live', KEYWORDS_FOR_SITE_BODY),
+            return_exceptions=True
+        )
+
+def summarize_results(body, limit=5):
+    """Count the first task's result entries and keep the first few"""
+    results = (json_loads(body).get('tasks') or [{}])[0].get('result') or []
+    return len(results), results[:limit]
+
+def unpack_response(outcome):
+    """Return (status, body) from a gathered fetch, re-raising its exception"""
+    if isinstance(outcome, BaseException):
+        raise outcome
+    return outcome
+
 def test_api_endpoints():
     """Test various DataForSEO API endpoints with correct parameters"""
     login = os.getenv('DATAFORSEO_LOGIN')
@@ -30,127 +108,113 @@ def test_api_endpoints():
         print("❌ No credentials found")
         return
     
-    base_url = "https://api.dataforseo.com/v3"
-    
     print("🧪 Testing DataForSEO API Endpoints")
     print("="*40)
     
+    # All four requests run at once; results are reported in order below
+    balance, results = asyncio.run(fetch_endpoints(login, password))
+    if results is None:
+        print(f"❌ DataForSEO balance too low (${balance}) - skipping endpoint tests")
+        return
+    
+    locations_result, languages_result, serp_result, keywords_result = results
+    
+    # Sections are buffered and written in one call
+    lines = []
+    
     # Test 1: Get available locations
-    print("\n1. Testing Available Locations...")
+    lines.append("\n1. Testing Available Locations...")
     try:
-        response = requests.get(
-            f"{base_url}/serp/google/locations",
-            auth=(login, password)
-        )
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Locations API working - Found {len(data.get('tasks', [{}])[0].get('result', []))} locations")
+        status, body = unpack_response(locations_result)
+        if status == 200:
+            count, locations = summarize_results(body)
+            lines.append(f"✅ Locations API working - Found {count} locations")
             # Show a few examples
-            locations = data.get('tasks', [{}])[0].get('result', [])[:5]
             for loc in locations:
-                print(f"   📍 {loc.get('location_name')}: {loc.get('location_code')}")
+                lines.append(f"   📍 {loc.get('location_name')}: {loc.get('location_code')}")
         else:
-            print(f"❌ Locations API failed: {response.status_code}")
+            lines.append(f"❌ Locations API failed: {status}")
     except Exception as e:
-        print(f"❌ Locations API error: {e}")
+        lines.append(f"❌ Locations API error: {e}")
     
     # Test 2: Get available languages
-    print("\n2. Testing Available Languages...")
+    lines.append("\n2. Testing Available Languages...")
     try:
-        response = requests.get(
-            f"{base_url}/serp/google/languages",
-            auth=(login, password)
-        )
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Languages API working - Found {len(data.get('tasks', [{}])[0].get('result', []))} languages")
+        status, body = unpack_response(languages_result)
+        if status == 200:
+            count, languages = summarize_results(body)
+            lines.append(f"✅ Languages API working - Found {count} languages")
             # Show a few examples
-            languages = data.get('tasks', [{}])[0].get('result', [])[:5]
             for lang in languages:
-                print(f"   🗣️  {lang.get('language_name')}: {lang.get('language_code')}")
+                lines.append(f"   🗣️  {lang.get('language_name')}: {lang.get('language_code')}")
         else:
-            print(f"❌ Languages API failed: {response.status_code}")
+            lines.append(f"❌ Languages API failed: {status}")
     except Exception as e:
-        print(f"❌ Languages API error: {e}")
+        lines.append(f"❌ Languages API error: {e}")
     
     # Test 3: Google SERP with correct parameters
-    print("\n3. Testing Google SERP with correct parameters...")
+    lines.append("\n3. Testing Google SERP with correct parameters...")
     try:
-        payload = [{
-            "keyword": "AI search",
-            "location_code": 2840,  # United States
-            "language_code": "en",  # English
-            "device": "desktop"
-        }]
-        
-        response = requests.post(
-            f"{base_url}/serp/google/organic/live/advanced",
-            auth=(login, password),
-            headers={'Content-Type': 'application/json'},
-            json=payload
-        )
+        status, body = unpack_response(serp_result)
         
-        if response.status_code == 200:
-            data = response.json()
-            print("✅ Google SERP API working!")
+        if status == 200:
+            data = json_loads(body)
+            lines.append(f"✅ Google SERP API working! ({len(SERP_KEYWORDS)} keywords in one request)")
             
-            if data.get('tasks') and data['tasks'][0].get('result'):
-                items = data['tasks'][0]['result'][0].get('items', [])
-                print(f"   📊 Found {len(items)} SERP items")
+            for task in data.get('tasks') or []:
+                keyword = (task.get('data') or {}).get('keyword')
+                lines.append(f"   🔎 '{keyword}'")
+                
+                if not task.get('result'):
+                    lines.append("   ⚠️  No SERP results returned")
+                    continue
+                
+                items = task['result'][0].get('items', [])
+                lines.append(f"   📊 Found {len(items)} SERP items")
+                
+                # Collect SERP feature types in a single pass
+                feature_types = {item.get('type') for item in items}
                 
                 # Check for AI Overview
-                ai_overview_found = any(item.get('type') == 'ai_overview' for item in items)
-                print(f"   🤖 AI Overview found: {ai_overview_found}")
+                ai_overview_found = 'ai_overview' in feature_types
+                lines.append(f"   🤖 AI Overview found: {ai_overview_found}")
                 
                 # Show SERP feature types
-                feature_types = list(set(item.get('type') for item in items))
-                print(f"   📈 SERP features: {feature_types}")
-            else:
-                print("   ⚠️  No SERP results returned")
+                lines.append(f"   📈 SERP features: {list(feature_types)}")
         else:
-            print(f"❌ Google SERP API failed: {response.status_code} - {response.text}")
+            lines.append(f"❌ Google SERP API failed: {status} - {body}")
     except Exception as e:
-        print(f"❌ Google SERP API error: {e}")
+        lines.append(f"❌ Google SERP API error: {e}")
     
     # Test 4: DataForSEO Labs Keywords for Site
-    print("\n4. Testing DataForSEO Labs Keywords for Site...")
+    lines.append("\n4. Testing DataForSEO Labs Keywords for Site...")
     try:
-        payload = [{
-            "target": "nike.com",
-            "location_code": 2840,  # United States
-            "language_code": "en",  # English
-            "limit": 10
-        }]
-        
-        response = requests.post(
-            f"{base_url}/dataforseo_labs/google/keywords_for_site/live",
-            auth=(login, password),
-            headers={'Content-Type': 'application/json'},
-            json=payload
-        )
+        status, body = unpack_response(keywords_result)
         
-        if response.status_code == 200:
-            data = response.json()
-            print("✅ Keywords for Site API working!")
+        if status == 200:
+            data = json_loads(body)
+            lines.append("✅ Keywords for Site API working!")
             
             if data.get('tasks') and data['tasks'][0].get('result'):
                 keywords = data['tasks'][0]['result']
-                print(f"   🔍 Found {len(keywords)} keywords")
+                lines.append(f"   🔍 Found {len(keywords)} keywords")
                 
                 # Show a few examples
                 for i, kw in enumerate(keywords[:3]):
                     if 'keyword_info' in kw:
                         keyword = kw['keyword_info']['keyword']
                         volume = kw['keyword_info'].get('search_volume', 'N/A')
-                        print(f"   📝 {keyword} (volume: {volume})")
+                        lines.append(f"   📝 {keyword} (volume: {volume})")
             else:
-                print("   ⚠️  No keyword results returned")
-        elif response.status_code == 402:
-            print("⚠️  Insufficient credits for Keywords for Site API")
+                lines.append("   ⚠️  No keyword results returned")
+        elif status == 402:
+            lines.append("⚠️  Insufficient credits for Keywords for Site API")
         else:
-            print(f"❌ Keywords for Site API failed: {response.status_code} - {response.text}")
+            lines.append(f"❌ Keywords for Site API failed: {status} - {body}")
     except Exception as e:
-        print(f"❌ Keywords for Site API error: {e}")
+        lines.append(f"❌ Keywords for Site API error: {e}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     test_api_endpoints()
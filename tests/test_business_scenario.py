@@ -5,6 +5,7 @@ Real Business Test: Analyze AI Visibility for a Brand using Informational Querie
 
 import sys
 import time
+import asyncio
 from ai_visibility_monitor import AIVisibilityMonitor, UserInput
 
 def run_business_test():
@@ -44,9 +45,9 @@ def run_business_test():
         device="desktop"
     )
     
-    # Run analysis
+    # Run analysis, with the five queries fetched concurrently
     monitor = AIVisibilityMonitor(login, password)
-    results = monitor.run_analysis(user_input)
+    results = asyncio.run(monitor.run_analysis_async(user_input))
     
     # Show summary
     print(f"\n📋 SUMMARY REPORT")
@@ -3,12 +3,43 @@
 Complete Fast Mode API Test - Shows the correct workflow
 """
 
-import time
+import asyncio
+import aiohttp
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def test_fast_mode_workflow():
-    """Demonstrates the correct way to use the fast mode API"""
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+API_URL = "https://data4seo-api.onrender.com"
+
+# Status polls back off 1s -> 1.5s -> 2.25s ... capped at 5s, within a 100 second budget
+POLL_BASE_DELAY = 1
+POLL_MAX_DELAY = 5
+MAX_WAIT = 100
+
+# One keep-alive session so repeated calls reuse pooled TCP/TLS connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+))
+
+def retry_after_seconds(value):
+    """Parse a delta-seconds Retry-After header, ignoring absent or HTTP-date values"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+async def run_fast_mode_workflow():
+    """Start a fast mode analysis, poll until it completes and fetch the results over one pooled session"""
     
     print("🚀 FAST MODE API WORKFLOW TEST")
     print("=" * 50)
@@ -25,106 +56,124 @@ def test_fast_mode_workflow():
         "fast_mode": True
     }
     
-    try:
-        response = requests.post(
-            "https://data4seo-api.onrender.com/api/v1/analyze",
-            json=request_data,
-            timeout=30
-        )
+    # The POST, status polls and final GET all reuse one keep-alive connection
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60)
+    ) as session:
+        try:
+            async with session.post(
+                f"{API_URL}/api/v1/analyze",
+                json=request_data,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                if response.status != 200:
+                    print(f"❌ Failed to start analysis: {response.status}")
+                    print(f"   Response: {await response.text()}")
+                    return False
+                initial_result = json_loads(await response.read())
+        except Exception as e:
+            print(f"❌ Error starting analysis: {e}")
+            return False
         
-        if response.status_code == 200:
-            initial_result = response.json()
-            analysis_id = initial_result['analysis_id']
-            
-            print(f"✅ Analysis started successfully!")
-            print(f"   Analysis ID: {analysis_id}")
-            print(f"   Status: {initial_result['status']}")
-            print(f"   Message: {initial_result['message']}")
-            print(f"   Started at: {initial_result['started_at']}")
-            print(f"   Completed at: {initial_result['completed_at']}")  # Will be null initially
-            
-            print("\n⏳ Step 2: Waiting for completion...")
-            print("   Expected time: 60-75 seconds (currently no parallel processing)")
+        analysis_id = initial_result['analysis_id']
+        
+        print(f"✅ Analysis started successfully!")
+        print(f"   Analysis ID: {analysis_id}")
+        print(f"   Status: {initial_result['status']}")
+        print(f"   Message: {initial_result['message']}")
+        print(f"   Started at: {initial_result['started_at']}")
+        print(f"   Completed at: {initial_result['completed_at']}")  # Will be null initially
+        
+        print("\n⏳ Step 2: Waiting for completion...")
+        print("   Expected time: 60-75 seconds (currently no parallel processing)")
+        
+        # Step 2: Poll for completion
+        request_timeout = aiohttp.ClientTimeout(total=10)
+        attempt = 0
+        elapsed = 0
+        last_etag = None
+        retry_after = None
+        
+        while elapsed < MAX_WAIT:
+            # A server Retry-After hint replaces the backoff schedule for the next poll
+            delay = retry_after if retry_after is not None else min(POLL_MAX_DELAY, POLL_BASE_DELAY * 1.5 ** attempt)
+            attempt += 1
+            await asyncio.sleep(delay)
+            elapsed += delay
             
-            # Step 2: Poll for completion
-            max_attempts = 20  # 20 attempts * 5 seconds = 100 seconds max
-            attempt = 0
+            # Unchanged status comes back as a bodyless 304, so there is nothing to parse
+            headers = {'If-None-Match': last_etag} if last_etag else None
             
-            while attempt < max_attempts:
-                attempt += 1
-                time.sleep(5)  # Wait 5 seconds between checks
+            try:
+                async with session.get(
+                    f"{API_URL}/api/v1/analysis/{analysis_id}/status",
+                    headers=headers,
+                    timeout=request_timeout
+                ) as status_response:
+                    retry_after = retry_after_seconds(status_response.headers.get('Retry-After'))
+                    if status_response.status == 304:
+                        print(f"   Check {attempt}: unchanged (elapsed: {elapsed:.1f}s)")
+                        continue
+                    if status_response.status != 200:
+                        print(f"   Check {attempt}: Status check failed ({status_response.status})")
+                        continue
+                    last_etag = status_response.headers.get('ETag')
+                    status = json_loads(await status_response.read())
+                
+                print(f"   Check {attempt}: {status['status']} (elapsed: {elapsed:.1f}s)")
                 
-                try:
-                    status_response = requests.get(
-                        f"https://data4seo-api.onrender.com/api/v1/analysis/{analysis_id}/status",
-                        timeout=10
-                    )
+                if status['status'] == 'completed':
+                    print(f"\n✅ Analysis completed!")
+                    print(f"   Started: {status['started_at']}")
+                    print(f"   Completed: {status['completed_at']}")
                     
-                    if status_response.status_code == 200:
-                        status = status_response.json()
-                        print(f"   Check {attempt}: {status['status']} (elapsed: {attempt * 5}s)")
-                        
-                        if status['status'] == 'completed':
-                            print(f"\n✅ Analysis completed!")
-                            print(f"   Started: {status['started_at']}")
-                            print(f"   Completed: {status['completed_at']}")
-                            
-                            # Step 3: Get full results
-                            print("\n📊 Step 3: Getting full results...")
-                            
-                            results_response = requests.get(
-                                f"https://data4seo-api.onrender.com/api/v1/analysis/{analysis_id}",
-                                timeout=10
-                            )
-                            
-                            if results_response.status_code == 200:
-                                results = results_response.json()
-                                summary = results['summary']
-                                
-                                print(f"\n🎯 FAST MODE RESULTS:")
-                                print(f"   Processing time: {summary['processing_time_seconds']} seconds")
-                                print(f"   Performance mode: {summary['performance_mode']}")
-                                print(f"   Keywords analyzed: {summary['optimization_applied']['keywords_analyzed']}")
-                                print(f"   Competitors analyzed: {summary['optimization_applied']['competitors_analyzed']}")
-                                print(f"   Parallel processing: {summary['optimization_applied']['parallel_processing']}")
-                                print(f"   AI Overview presence: {summary['ai_overview_presence']['percentage']}%")
-                                print(f"   Brand citations: {summary['brand_citations']['percentage']}%")
-                                print(f"   Speed improvement: {summary['performance_insights']['speed_improvement']}")
-                                
-                                return True
-                            else:
-                                print(f"❌ Failed to get results: {results_response.status_code}")
-                                return False
-                                
-                        elif status['status'] == 'failed':
-                            print(f"❌ Analysis failed!")
+                    # Step 3: Get full results
+                    print("\n📊 Step 3: Getting full results...")
+                    
+                    async with session.get(
+                        f"{API_URL}/api/v1/analysis/{analysis_id}",
+                        timeout=request_timeout
+                    ) as results_response:
+                        if results_response.status != 200:
+                            print(f"❌ Failed to get results: {results_response.status}")
                             return False
-                            
-                    else:
-                        print(f"   Check {attempt}: Status check failed ({status_response.status_code})")
-                        
-                except Exception as e:
-                    print(f"   Check {attempt}: Error - {e}")
-            
-            print(f"\n⏰ Timeout: Analysis didn't complete within {max_attempts * 5} seconds")
-            return False
-            
-        else:
-            print(f"❌ Failed to start analysis: {response.status_code}")
-            print(f"   Response: {response.text}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Error starting analysis: {e}")
+                        results = json_loads(await results_response.read())
+                    
+                    summary = results['summary']
+                    
+                    print(f"\n🎯 FAST MODE RESULTS:")
+                    print(f"   Processing time: {summary['processing_time_seconds']} seconds")
+                    print(f"   Performance mode: {summary['performance_mode']}")
+                    print(f"   Keywords analyzed: {summary['optimization_applied']['keywords_analyzed']}")
+                    print(f"   Competitors analyzed: {summary['optimization_applied']['competitors_analyzed']}")
+                    print(f"   Parallel processing: {summary['optimization_applied']['parallel_processing']}")
+                    print(f"   AI Overview presence: {summary['ai_overview_presence']['percentage']}%")
+                    print(f"   Brand citations: {summary['brand_citations']['percentage']}%")
+                    print(f"   Speed improvement: {summary['performance_insights']['speed_improvement']}")
+                    
+                    return True
+                
+                elif status['status'] == 'failed':
+                    print(f"❌ Analysis failed!")
+                    return False
+                
+            except Exception as e:
+                print(f"   Check {attempt}: Error - {e}")
+        
+        print(f"\n⏰ Timeout: Analysis didn't complete within {MAX_WAIT} seconds")
         return False
 
+def test_fast_mode_workflow():
+    """Demonstrates the correct way to use the fast mode API"""
+    return asyncio.run(run_fast_mode_workflow())
+
 def test_api_info():
     """Test the API info endpoint"""
     print("\n📋 API Information:")
     try:
-        response = requests.get("https://data4seo-api.onrender.com/api/info", timeout=10)
+        response = SESSION.get(f"{API_URL}/api/info", timeout=10)
         if response.status_code == 200:
-            info = response.json()
+            info = json_loads(response.content)
             print(f"   Service: {info['service']}")
             print(f"   Version: {info['version']}")
             print(f"   Fast mode parallel processing: {info['api']['fast_mode']['parallel_processing']}")
@@ -7,20 +7,118 @@ import requests
 import json
 import os
 import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Load environment variables
-def load_env():
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+
+from _env import load_env
 
 load_env()
 
+pytestmark = pytest.mark.dataforseo
+
+# One keep-alive session so repeated calls reuse pooled TCP/TLS connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+))
+
+BASE_URL = "https://api.dataforseo.com/v3"
+
+KEYWORDS = ["AI search", "what is generative AI"]
+
+# Every keyword rides in one task-array POST; the response tasks come back in the same order
+PAYLOAD = [{
+    "keyword": keyword,
+    "location_code": 2840,
+    "language_code": "en",
+    "device": "desktop"
+} for keyword in KEYWORDS]
+
+# Encoded once and sent as-is to both endpoints
+PAYLOAD_BODY = json_dumps(PAYLOAD)
+
+def probe(name, path):
+    """POST the shared pre-encoded payload to one endpoint and time the roundtrip"""
+    start_time = time.perf_counter_ns()
+    try:
+        response = SESSION.post(f"{BASE_URL}{path}", data=PAYLOAD_BODY)
+    except Exception as e:
+        return {'name': name, 'status': None, 'elapsed': (time.perf_counter_ns() - start_time) / 1_000_000_000, 'body': None, 'error': e}
+    
+    elapsed = (time.perf_counter_ns() - start_time) / 1_000_000_000
+    body = json_loads(response.content) if response.status_code == 200 else response.text
+    return {'name': name, 'status': response.status_code, 'elapsed': elapsed, 'body': body, 'error': None}
+
+def probe_live():
+    """Test 1: Live Advanced Endpoint"""
+    return probe('live', "/serp/google/organic/live/advanced")
+
+def probe_task():
+    """Test 2: Task-Based Endpoint (just posting, not waiting)"""
+    return probe('task', "/serp/google/organic/task_post")
+
+def print_live_result(result):
+    """Report the live endpoint probe"""
+    print("\n1. Testing Live Advanced Endpoint...")
+    if result['error'] is not None:
+        print(f"   ❌ Live API error: {result['error']}")
+    elif result['status'] == 200:
+        data = result['body']
+        print(f"   ✅ Live API working! Response time: {result['elapsed']:.2f}s")
+        
+        # Tasks are matched to keywords by their echoed data, not by response order
+        for task in data.get('tasks') or []:
+            keyword = (task.get('data') or {}).get('keyword')
+            if not task.get('result'):
+                continue
+            items = task['result'][0].get('items') or []
+            print(f"   📊 '{keyword}': Found {len(items)} SERP items")
+            
+            # Check for AI Overview
+            ai_overview_found = any(item.get('type') == 'ai_overview' for item in items)
+            print(f"   🤖 '{keyword}': AI Overview found: {ai_overview_found}")
+    else:
+        print(f"   ❌ Live API failed: {result['status']}")
+        print(f"   📝 Response: {result['body'][:200]}")
+
+def print_task_result(result):
+    """Report the task_post endpoint probe"""
+    print("\n2. Testing Task-Based Endpoint (posting only)...")
+    if result['error'] is not None:
+        print(f"   ❌ Task API error: {result['error']}")
+    elif result['status'] == 200:
+        task_data = result['body']
+        print(f"   ✅ Task posted successfully! Response time: {result['elapsed']:.2f}s")
+        
+        for task in task_data.get('tasks') or []:
+            keyword = (task.get('data') or {}).get('keyword')
+            if task.get('id'):
+                print(f"   📋 '{keyword}': Task ID: {task['id']}")
+                print(f"   💰 '{keyword}': Cost: {task.get('cost', 'N/A')}")
+    else:
+        print(f"   ❌ Task API failed: {result['status']}")
+        print(f"   📝 Response: {result['body'][:200]}")
+
+PRINTERS = {'live': print_live_result, 'task': print_task_result}
+
+def print_result(result):
+    """Report a probe result with the printer for its endpoint"""
+    PRINTERS[result['name']](result)
+
 def test_live_vs_task_api():
     """Test both live and task-based approaches"""
     login = os.getenv('DATAFORSEO_LOGIN')
@@ -30,80 +128,17 @@ def test_live_vs_task_api():
         print("❌ No credentials found")
         return
     
-    base_url = "https://api.dataforseo.com/v3"
+    SESSION.auth = (login, password)
+    SESSION.headers.update({'Content-Type': 'application/json'})
     
     print("🧪 Testing Live vs Task-Based DataForSEO API")
     print("="*45)
     
-    payload = [{
-        "keyword": "AI search",
-        "location_code": 2840,
-        "language_code": "en",
-        "device": "desktop"
-    }]
-    
-    # Test 1: Live Advanced Endpoint
-    print("\n1. Testing Live Advanced Endpoint...")
-    try:
-        live_url = f"{base_url}/serp/google/organic/live/advanced"
-        start_time = time.time()
-        
-        response = requests.post(
-            live_url,
-            auth=(login, password),
-            headers={'Content-Type': 'application/json'},
-            json=payload
-        )
-        
-        end_time = time.time()
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"   ✅ Live API working! Response time: {end_time - start_time:.2f}s")
-            
-            if data.get('tasks') and data['tasks'][0].get('result'):
-                items = data['tasks'][0]['result'][0].get('items', [])
-                print(f"   📊 Found {len(items)} SERP items")
-                
-                # Check for AI Overview
-                ai_overview_found = any(item.get('type') == 'ai_overview' for item in items)
-                print(f"   🤖 AI Overview found: {ai_overview_found}")
-        else:
-            print(f"   ❌ Live API failed: {response.status_code}")
-            print(f"   📝 Response: {response.text[:200]}")
-            
-    except Exception as e:
-        print(f"   ❌ Live API error: {e}")
-    
-    # Test 2: Task-Based Endpoint (just posting, not waiting)
-    print("\n2. Testing Task-Based Endpoint (posting only)...")
-    try:
-        task_url = f"{base_url}/serp/google/organic/task_post"
-        start_time = time.time()
-        
-        response = requests.post(
-            task_url,
-            auth=(login, password),
-            headers={'Content-Type': 'application/json'},
-            json=payload
-        )
-        
-        end_time = time.time()
-        
-        if response.status_code == 200:
-            task_data = response.json()
-            print(f"   ✅ Task posted successfully! Response time: {end_time - start_time:.2f}s")
-            
-            if task_data.get('tasks') and task_data['tasks'][0].get('id'):
-                task_id = task_data['tasks'][0]['id']
-                print(f"   📋 Task ID: {task_id}")
-                print(f"   💰 Cost: {task_data['tasks'][0].get('cost', 'N/A')}")
-        else:
-            print(f"   ❌ Task API failed: {response.status_code}")
-            print(f"   📝 Response: {response.text[:200]}")
-            
-    except Exception as e:
-        print(f"   ❌ Task API error: {e}")
+    # Both probes are independent, so they run concurrently on the shared session pool
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(probe_live), executor.submit(probe_task)]
+        for future in as_completed(futures):
+            print_result(future.result())
 
 if __name__ == "__main__":
     test_live_vs_task_api()
@@ -5,27 +5,60 @@ Tests the optimized fast monitor vs standard monitor without API overhead
 Focuses on demonstrating real performance improvements
 """
 
+import sys
 import time
 import os
+import pytest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict
 
 # Import the optimized fast monitor
 from fast_ai_visibility_monitor import run_saas_analysis
 
-def load_env():
-    """Load environment variables from .env file"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+from _env import load_env
 
 load_env()
 
+pytestmark = pytest.mark.dataforseo
+
+# Report line templates, formatted per item
+FEATURE_TEMPLATE = "{i}. {name}\n   Before: {before}\n   After:  {after}\n   Benefit: {benefit}\n"
+OPTIMIZATION_TEMPLATE = "   ✅ {0}: {1}"
+SAAS_BENEFIT_TEMPLATE = "   🚀 {0}"
+
+# Constant report banners, written in one call each
+PERFORMANCE_TEST_BANNER = "🧪 AI Visibility Monitor - Performance Test & Analysis\n" + "=" * 60
+PERFORMANCE_TEST_OBJECTIVE = "Objective: Demonstrate optimized script performance for SaaS integration"
+NEXT_STEPS_BANNER = "\n".join([
+    "\n🎯 Next Steps:",
+    "   1. Deploy fast_api_service.py for production API",
+    "   2. Integrate with your SaaS onboarding flow",
+    "   3. Use /api/v2/onboarding-analysis endpoint",
+    "   4. Monitor performance and user conversion rates",
+    "\n🚀 The optimized AI Visibility Monitor is ready for SaaS integration!"
+])
+
+# Standard analysis estimate (based on original implementation)
+STANDARD_TIME_PER_KEYWORD_MS = 25000  # ~25 seconds per keyword (sequential + delays)
+
+def rollup_runs(runs):
+    """Aggregate (time_ms, keywords) pairs from one or more runs in a single pass"""
+    totals = Counter()
+    for time_ms, keywords in runs:
+        totals['time_ms'] += time_ms
+        totals['keywords'] += keywords
+    
+    standard_total_time = totals['keywords'] * STANDARD_TIME_PER_KEYWORD_MS
+    return {
+        "time_ms": totals['time_ms'],
+        "keywords": totals['keywords'],
+        "standard_total_time": standard_total_time,
+        "improvement_factor": standard_total_time / totals['time_ms'],
+        "time_saved": (standard_total_time - totals['time_ms']) / 1000
+    }
+
 def test_fast_analysis_performance():
     """Test the fast analysis performance with real API calls"""
     print("🚀 Testing Fast AI Visibility Analysis Performance")
@@ -55,7 +88,7 @@ def test_fast_analysis_performance():
     
     # Run the fast analysis
     print(f"\n⚡ Running Fast Analysis...")
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     
     try:
         result = run_saas_analysis(
@@ -66,8 +99,8 @@ def test_fast_analysis_performance():
             location="United States"
         )
         
-        end_time = time.time()
-        total_time = (end_time - start_time) * 1000
+        end_time = time.perf_counter_ns()
+        total_time = (end_time - start_time) / 1_000_000
         
         if result.get('success'):
             summary = result['summary']
@@ -103,27 +136,24 @@ def test_fast_analysis_performance():
 
 def analyze_performance_improvements(actual_time_ms, summary):
     """Analyze and display performance improvements"""
-    print(f"\n🏆 PERFORMANCE ANALYSIS")
-    print("=" * 35)
+    lines = []
+    lines.append(f"\n🏆 PERFORMANCE ANALYSIS")
+    lines.append("=" * 35)
     
-    # Calculate what standard analysis would take
+    # Compare against what standard analysis would take
     keywords_tested = summary['performance']['keywords_analyzed']
-    
-    # Standard analysis estimates (based on original implementation)
-    standard_time_per_keyword = 25000  # ~25 seconds per keyword (sequential + delays)
-    standard_total_time = keywords_tested * standard_time_per_keyword
-    
-    # Performance comparison
-    improvement_factor = standard_total_time / actual_time_ms
-    time_saved = (standard_total_time - actual_time_ms) / 1000
-    
-    print(f"📊 Speed Comparison:")
-    print(f"   Fast Analysis:     {actual_time_ms:.0f}ms ({actual_time_ms/1000:.1f}s)")
-    print(f"   Standard Analysis: {standard_total_time}ms ({standard_total_time/1000:.0f}s) [estimated]")
-    print(f"   Speed Improvement: {improvement_factor:.1f}x faster")
-    print(f"   Time Saved:        {time_saved:.1f} seconds")
-    
-    print(f"\n⚡ Optimization Benefits:")
+    rollup = rollup_runs([(actual_time_ms, keywords_tested)])
+    standard_total_time = rollup['standard_total_time']
+    improvement_factor = rollup['improvement_factor']
+    time_saved = rollup['time_saved']
+    
+    lines.append(f"📊 Speed Comparison:")
+    lines.append(f"   Fast Analysis:     {actual_time_ms:.0f}ms ({actual_time_ms/1000:.1f}s)")
+    lines.append(f"   Standard Analysis: {standard_total_time}ms ({standard_total_time/1000:.0f}s) [estimated]")
+    lines.append(f"   Speed Improvement: {improvement_factor:.1f}x faster")
+    lines.append(f"   Time Saved:        {time_saved:.1f} seconds")
+    
+    lines.append(f"\n⚡ Optimization Benefits:")
     optimizations = [
         ("Parallel Processing", "6x faster SERP data collection"),
         ("Smart Keyword Limiting", f"{keywords_tested} keywords vs 20+ in standard"),
@@ -133,10 +163,9 @@ def analyze_performance_improvements(actual_time_ms, summary):
         ("Cached Mappings", "Instant location/language resolution")
     ]
     
-    for optimization, benefit in optimizations:
-        print(f"   ✅ {optimization}: {benefit}")
+    lines.extend(OPTIMIZATION_TEMPLATE.format(*optimization) for optimization in optimizations)
     
-    print(f"\n🎯 SaaS Integration Benefits:")
+    lines.append(f"\n🎯 SaaS Integration Benefits:")
     saas_benefits = [
         f"Real-time user onboarding ({actual_time_ms/1000:.0f}s response)",
         "Perfect for freemium model previews",
@@ -146,8 +175,9 @@ def analyze_performance_improvements(actual_time_ms, summary):
         "Immediate value demonstration"
     ]
     
-    for benefit in saas_benefits:
-        print(f"   🚀 {benefit}")
+    lines.extend(SAAS_BENEFIT_TEMPLATE.format(benefit) for benefit in saas_benefits)
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def simulate_performance_comparison():
     """Simulate performance comparison when no API credentials available"""
@@ -192,10 +222,11 @@ def simulate_performance_comparison():
         "improvement_factor": improvement
     }
 
-def demonstrate_optimization_features():
-    """Demonstrate the key optimization features implemented"""
-    print(f"\n🔧 KEY OPTIMIZATION FEATURES IMPLEMENTED")
-    print("=" * 50)
+def optimization_feature_lines():
+    """Build the key optimization features report lines"""
+    lines = []
+    lines.append(f"\n🔧 KEY OPTIMIZATION FEATURES IMPLEMENTED")
+    lines.append("=" * 50)
     
     features = [
         {
@@ -236,19 +267,21 @@ def demonstrate_optimization_features():
         }
     ]
     
-    for i, feature in enumerate(features, 1):
-        print(f"{i}. {feature['name']}")
-        print(f"   Before: {feature['before']}")
-        print(f"   After:  {feature['after']}")
-        print(f"   Benefit: {feature['benefit']}")
-        print()
+    lines.extend(FEATURE_TEMPLATE.format_map({**feature, 'i': i}) for i, feature in enumerate(features, 1))
+    
+    return lines
 
-def show_saas_integration_guide():
-    """Show how to integrate the fast analysis into SaaS applications"""
-    print(f"💼 SAAS INTEGRATION GUIDE")
-    print("=" * 30)
+def demonstrate_optimization_features():
+    """Demonstrate the key optimization features implemented"""
+    sys.stdout.write("\n".join(optimization_feature_lines()) + "\n")
+
+def saas_integration_guide_lines():
+    """Build the SaaS integration guide lines"""
+    lines = []
+    lines.append(f"💼 SAAS INTEGRATION GUIDE")
+    lines.append("=" * 30)
     
-    print(f"🎯 Perfect Use Cases:")
+    lines.append(f"🎯 Perfect Use Cases:")
     use_cases = [
         "User onboarding flows (immediate AI readiness assessment)",
         "Freemium model previews (fast analysis free, detailed premium)",
@@ -258,10 +291,9 @@ def show_saas_integration_guide():
         "Batch processing for existing customers"
     ]
     
-    for use_case in use_cases:
-        print(f"   ✅ {use_case}")
+    lines.extend(f"   ✅ {use_case}" for use_case in use_cases)
     
-    print(f"\n🔧 Integration Example:")
+    lines.append(f"\n🔧 Integration Example:")
     integration_code = '''
 # Simple SaaS integration
 from fast_ai_visibility_monitor import run_saas_analysis
@@ -290,9 +322,9 @@ def analyze_user_brand(brand_name, website, keywords):
 # Business value: Immediate insights drive premium upgrades
 '''
     
-    print(integration_code)
+    lines.append(integration_code)
     
-    print(f"📈 Business Benefits:")
+    lines.append(f"📈 Business Benefits:")
     benefits = [
         "Real-time user onboarding (no waiting)",
         "High conversion rates (immediate value)",
@@ -302,24 +334,28 @@ def analyze_user_brand(brand_name, website, keywords):
         "Competitive advantage in market"
     ]
     
-    for benefit in benefits:
-        print(f"   💰 {benefit}")
+    lines.extend(f"   💰 {benefit}" for benefit in benefits)
+    
+    return lines
+
+def show_saas_integration_guide():
+    """Show how to integrate the fast analysis into SaaS applications"""
+    sys.stdout.write("\n".join(saas_integration_guide_lines()) + "\n")
 
 def run_complete_performance_test():
     """Run the complete performance test and analysis"""
-    print("🧪 AI Visibility Monitor - Performance Test & Analysis")
-    print("=" * 60)
-    print(f"Test Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Objective: Demonstrate optimized script performance for SaaS integration")
-    
-    # Test the fast analysis
-    result = test_fast_analysis_performance()
+    test_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    sys.stdout.write(f"{PERFORMANCE_TEST_BANNER}\nTest Date: {test_date}\n{PERFORMANCE_TEST_OBJECTIVE}\n")
     
-    # Show optimization features
-    demonstrate_optimization_features()
+    # Run the network-bound fast analysis in the background and build the
+    # feature/guide reports meanwhile; they are written after it finishes
+    # so the console output keeps its order
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        api_future = executor.submit(test_fast_analysis_performance)
+        report_lines = optimization_feature_lines() + saas_integration_guide_lines()
+        result = api_future.result()
     
-    # Show SaaS integration guide
-    show_saas_integration_guide()
+    sys.stdout.write("\n".join(report_lines) + "\n")
     
     # Final summary
     print(f"\n✅ PERFORMANCE TEST SUMMARY")
@@ -333,14 +369,15 @@ def run_complete_performance_test():
         print(f"   - Status: ✅ Ready for SaaS Integration")
         
         # Calculate improvement vs standard
-        standard_estimate = result['keywords_processed'] * 25000
-        improvement = standard_estimate / result['total_time_ms']
+        rollup = rollup_runs([(result['total_time_ms'], result['keywords_processed'])])
+        standard_estimate = rollup['standard_total_time']
+        improvement = rollup['improvement_factor']
         
         print(f"\n🚀 Performance Improvement:")
         print(f"   - Fast Analysis: {result['total_time_ms']:.0f}ms")
         print(f"   - Standard Estimate: {standard_estimate}ms")
         print(f"   - Improvement: {improvement:.1f}x faster")
-        print(f"   - Time Saved: {(standard_estimate - result['total_time_ms'])/1000:.0f} seconds")
+        print(f"   - Time Saved: {rollup['time_saved']:.0f} seconds")
         
     elif result.get('simulated'):
         print(f"🎯 Simulated Performance:")
@@ -352,13 +389,7 @@ def run_complete_performance_test():
         print(f"❌ Test failed: {result.get('error')}")
         print(f"💡 Set up DataForSEO credentials for live testing")
     
-    print(f"\n🎯 Next Steps:")
-    print(f"   1. Deploy fast_api_service.py for production API")
-    print(f"   2. Integrate with your SaaS onboarding flow")
-    print(f"   3. Use /api/v2/onboarding-analysis endpoint")
-    print(f"   4. Monitor performance and user conversion rates")
-    
-    print(f"\n🚀 The optimized AI Visibility Monitor is ready for SaaS integration!")
+    print(NEXT_STEPS_BANNER)
 
 if __name__ == "__main__":
     run_complete_performance_test()
@@ -3,35 +3,227 @@
 Test the task-based DataForSEO API implementation
 """
 
-import requests
+import asyncio
 import json
 import os
-import time
-
-# Load environment variables from .env file if it exists
-def load_env():
-    """Load environment variables from .env file"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(env_path):
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+import random
+import pytest
+from functools import partial
 
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+
+from coalesce import RequestCoalescer
+from _env import load_env
+from _serp_cache import CACHE_TTL, read_cache, write_cache
+
+# Stays at import: it is cached and cheap, and conftest reads LOGIN at collection to skip uncredentialed runs
 load_env()
 
-def test_task_based_api():
-    """Test the task-based DataForSEO API approach"""
-    login = os.getenv('DATAFORSEO_LOGIN')
-    password = os.getenv('DATAFORSEO_PASSWORD')
+LOGIN = os.getenv('DATAFORSEO_LOGIN')
+PASSWORD = os.getenv('DATAFORSEO_PASSWORD')
+# Built once; the session reuses it for every request instead of per-call auth arguments
+_AUTH = (LOGIN, PASSWORD) if LOGIN and PASSWORD else None
+
+pytestmark = pytest.mark.dataforseo
+
+# tasks_ready polls back off 0.5s -> 1s -> 2s ... capped at 8s, plus jitter so reruns don't poll in lockstep
+POLL_BASE_DELAY = 0.5
+POLL_MAX_DELAY = 8
+POLL_JITTER = 0.25
+
+# Throttled and transient server errors are retried with exponential backoff, honoring Retry-After.
+# A gateway 5xx does not prove a paid task was never created, so POSTs are only retried on 429
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+POST_RETRY_STATUSES = frozenset({429})
+MAX_RETRIES = 5
+RETRY_BACKOFF = 0.5
+
+BASE_URL = "https://api.dataforseo.com/v3"
+POST_URL = f"{BASE_URL}/serp/google/organic/task_post"
+READY_URL = f"{BASE_URL}/serp/google/organic/tasks_ready"
+GET_BASE_URL = f"{BASE_URL}/serp/google/organic/task_get/advanced"
+
+TASK_PAYLOAD = [{
+    "keyword": "AI search",
+    "location_code": 2840,  # United States
+    "language_code": "en",   # English
+    "device": "desktop"
+}]
+
+# The default task list is encoded once; other batches are encoded per post
+TASK_PAYLOAD_BODY = json_dumps(TASK_PAYLOAD)
+
+# Identical runs already in flight (e.g. from parallel runner threads) share one post/poll/fetch
+_COALESCER = RequestCoalescer()
+TASK_KEY = json.dumps(TASK_PAYLOAD, sort_keys=True)
+
+# Optional server push: when DATAFORSEO_CALLBACK_URL is a public URL (e.g. an ngrok tunnel) that
+# forwards to CALLBACK_PORT here, DataForSEO posts the advanced results to us on completion, so
+# there is neither tasks_ready polling nor a task_get fetch
+CALLBACK_URL = os.getenv('DATAFORSEO_CALLBACK_URL')
+CALLBACK_PORT = int(os.getenv('CALLBACK_PORT', '8765'))
+
+async def start_callback_server(ready_events, postbacks):
+    """Serve DataForSEO postbacks, storing each task's results body and setting its ready event"""
+    import gzip
+    from aiohttp import web
     
-    if not login or not password:
-        print("❌ No credentials found")
-        return
+    async def postback(request):
+        task_id = request.query.get('id')
+        body = await request.read()
+        # Postbacks may arrive gzipped without a Content-Encoding header
+        if body[:2] == b'\x1f\x8b':
+            body = gzip.decompress(body)
+        if task_id:
+            postbacks[task_id] = body.decode()
+            ready_events.setdefault(task_id, asyncio.Event()).set()
+        return web.Response(text="ok")
+    
+    app = web.Application()
+    app.router.add_post('/postback', postback)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, port=CALLBACK_PORT).start()
+    return runner
+
+async def wait_for_postbacks(ready_events, task_ids, max_wait):
+    """Wait for the postbacks of task_ids instead of polling tasks_ready; returns the ids that arrived"""
+    # A postback may already have arrived while the post response was in flight
+    events = {task_id: ready_events.setdefault(task_id, asyncio.Event()) for task_id in task_ids}
+    try:
+        await asyncio.wait_for(asyncio.gather(*(event.wait() for event in events.values())), timeout=max_wait)
+    except asyncio.TimeoutError:
+        pass
+    
+    ready = {task_id for task_id, event in events.items() if event.is_set()}
+    for task_id in ready:
+        print(f"   ✅ Task {task_id} is ready!")
+    return ready
+
+async def request_with_retry(session, method, url, **kwargs):
+    """Send a request, retrying throttled (and for GETs, 5xx) responses; the caller closes the returned response"""
+    retry_statuses = POST_RETRY_STATUSES if method == 'POST' else RETRY_STATUSES
+    for attempt in range(MAX_RETRIES + 1):
+        response = await session.request(method, url, **kwargs)
+        if response.status not in retry_statuses or attempt == MAX_RETRIES:
+            return response
+        
+        retry_after = response.headers.get('Retry-After', '')
+        response.release()
+        await asyncio.sleep(float(retry_after) if retry_after.isdigit() else RETRY_BACKOFF * 2 ** attempt)
+
+async def post_all(session, body):
+    """Post every task of a pre-encoded task array in one request; returns the task ids in payload order"""
+    async with await request_with_retry(session, 'POST', POST_URL, data=body) as response:
+        if response.status != 200:
+            print(f"   ❌ Failed to post task: {response.status}")
+            print(f"   📝 Response: {await response.text()}")
+            return []
+        task_data = json_loads(await response.read())
+    
+    print(f"   ✅ Task posted successfully!")
     
-    base_url = "https://api.dataforseo.com/v3"
+    task_ids = [task.get('id') for task in task_data.get('tasks') or []]
+    if not task_ids or not all(task_ids):
+        print("   ❌ No task ID in response")
+        print(f"   📝 Response: {task_data}")
+        return []
+    
+    for task_id in task_ids:
+        print(f"   📋 Task ID: {task_id}")
+    return task_ids
+
+async def wait_ready(session, task_ids, max_wait):
+    """Poll tasks_ready with backoff, accumulating ready ids until all task_ids are in or max_wait elapses"""
+    pending = set(task_ids)
+    wait_time = 0
+    attempt = 0
+    last_body = None
+    headers = None
+    
+    # Bound once so each poll skips rebuilding the call; headers only change with the ETag
+    get_ready = partial(request_with_retry, session, 'GET', READY_URL)
+    
+    while True:
+        # Check which tasks are ready; an unchanged list (304, or the same bytes when the
+        # server sends no ETag) cannot contain new ids, so it is not parsed again
+        async with await get_ready(headers=headers) as ready_response:
+            body = await ready_response.read() if ready_response.status == 200 else None
+            if body is not None and body != last_body:
+                last_etag = ready_response.headers.get('ETag')
+                headers = {'If-None-Match': last_etag} if last_etag else None
+                last_body = body
+                ready_data = json_loads(body)
+                
+                # One hash pass over the account-wide ready list, then a set intersection
+                ready_ids = {task.get('id') for task in ready_data.get('tasks') or ()}
+                for task_id in pending & ready_ids:
+                    print(f"   ✅ Task {task_id} is ready!")
+                pending -= ready_ids
+        
+        if not pending or wait_time >= max_wait:
+            return set(task_ids) - pending
+        
+        delay = min(POLL_MAX_DELAY, POLL_BASE_DELAY * 2 ** attempt) + random.uniform(0, POLL_JITTER)
+        await asyncio.sleep(delay)
+        wait_time += delay
+        attempt += 1
+        print(f"   ⏳ Still waiting... ({wait_time:.1f}s)")
+
+async def fetch_all(session, task_ids):
+    """Fetch every ready task's advanced results concurrently; returns id -> body (None on failure)"""
+    async def fetch(task_id):
+        get_url = f"{GET_BASE_URL}/{task_id}"
+        print(f"   📥 Fetching results from: {get_url}")
+        
+        async with await request_with_retry(session, 'GET', get_url) as result_response:
+            if result_response.status != 200:
+                print(f"   ❌ Failed to get results: {result_response.status}")
+                print(f"   📝 Response: {(await result_response.text())[:200]}")
+                return None
+            return await result_response.text()
+    
+    bodies = await asyncio.gather(*(fetch(task_id) for task_id in task_ids))
+    return dict(zip(task_ids, bodies))
+
+def task_succeeded(body):
+    """Whether a task_get/advanced body holds a successful task with results, and so is worth caching"""
+    task = (json_loads(body).get('tasks') or [{}])[0]
+    return task.get('status_code') == 20000 and bool(task.get('result'))
+
+def summarize_items(body):
+    """Return (has_result, item_count, feature_types) for a task_get/advanced body"""
+    result_data = json_loads(body)
+    if not (result_data.get('tasks') and result_data['tasks'][0].get('result')):
+        return False, 0, set()
+    items = result_data['tasks'][0]['result'][0].get('items', [])
+    return True, len(items), {item.get('type') for item in items}
+
+def report_results(body):
+    """Print the SERP summary for a task_get/advanced response body"""
+    has_result, item_count, feature_types = summarize_items(body)
+    if has_result:
+        print(f"   📊 Found {item_count} SERP items")
+        
+        # Check for AI Overview
+        print(f"   🤖 AI Overview found: {'ai_overview' in feature_types}")
+        
+        # Show SERP feature types
+        print(f"   📈 SERP features: {list(feature_types)[:10]}")  # Limit output
+    else:
+        print("   ⚠️  No results in response")
+
+async def run_task_based_api(auth=_AUTH, tasks=TASK_PAYLOAD):
+    """Post SERP tasks, wait until they are ready and fetch their results over one keep-alive session"""
+    import aiohttp
     
     print("🧪 Testing Task-Based DataForSEO API")
     print("="*40)
@@ -39,99 +231,92 @@ def test_task_based_api():
     # Test Google SERP task-based approach
     print("\n1. Testing Google SERP Task-Based Approach...")
     
-    try:
-        # Step 1: Post task
-        post_url = f"{base_url}/serp/google/organic/task_post"
-        payload = [{
-            "keyword": "AI search",
-            "location_code": 2840,  # United States
-            "language_code": "en",   # English
-            "device": "desktop"
-        }]
-        
-        print("   📤 Posting task...")
-        response = requests.post(
-            post_url,
-            auth=(login, password),
-            headers={'Content-Type': 'application/json'},
-            json=payload
-        )
-        
-        if response.status_code == 200:
-            task_data = response.json()
-            print(f"   ✅ Task posted successfully!")
+    # The task post, every readiness poll and the result fetches share one keep-alive connection pool
+    async with aiohttp.ClientSession(
+        auth=aiohttp.BasicAuth(*auth),
+        connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60),
+        headers={'Content-Type': 'application/json'}
+    ) as session:
+        callback_runner = None
+        ready_events = {}
+        postbacks = {}
+        try:
+            # Recent results for the same task parameters skip the post, polling and fetch entirely
+            results = {}
+            to_post = []
+            for task in tasks:
+                cached_body = read_cache(['task_get/advanced', task], CACHE_TTL)
+                if cached_body is not None:
+                    print(f"   📦 Using cached task results for '{task['keyword']}'")
+                    results[task['keyword']] = cached_body
+                else:
+                    to_post.append(task)
             
-            if task_data.get('tasks') and task_data['tasks'][0].get('id'):
-                task_id = task_data['tasks'][0]['id']
-                print(f"   📋 Task ID: {task_id}")
+            if to_post:
+                # Step 1: Post tasks
+                payload = to_post
+                if CALLBACK_URL:
+                    callback_runner = await start_callback_server(ready_events, postbacks)
+                    payload = [{
+                        **task,
+                        "postback_url": f"{CALLBACK_URL}/postback?id=$id",
+                        "postback_data": "advanced"
+                    } for task in to_post]
+                body = TASK_PAYLOAD_BODY if payload == TASK_PAYLOAD else json_dumps(payload)
+                
+                print("   📤 Posting task...")
+                task_ids = await post_all(session, body)
+                if not task_ids:
+                    return
                 
-                # Step 2: Check task status
+                # Step 2: Check task status, starting as soon as the task ids are known
                 print("   ⏳ Waiting for task completion...")
                 
                 max_wait = 30
-                wait_time = 0
-                task_ready = False
+                if callback_runner is not None:
+                    ready_ids = await wait_for_postbacks(ready_events, task_ids, max_wait)
+                else:
+                    ready_ids = await wait_ready(session, task_ids, max_wait)
                 
-                while wait_time < max_wait:
-                    # Check if task is ready
-                    ready_url = f"{base_url}/serp/google/organic/tasks_ready"
-                    ready_response = requests.get(ready_url, auth=(login, password))
-                    
-                    if ready_response.status_code == 200:
-                        ready_data = ready_response.json()
-                        
-                        if ready_data.get('tasks'):
-                            for task in ready_data['tasks']:
-                                if task.get('id') == task_id:
-                                    task_ready = True
-                                    print(f"   ✅ Task {task_id} is ready!")
-                                    break
-                    
-                    if task_ready:
-                        break
-                    
-                    time.sleep(2)
-                    wait_time += 2
-                    print(f"   ⏳ Still waiting... ({wait_time}s)")
+                if len(ready_ids) < len(task_ids):
+                    print(f"   ⏰ Task did not complete within {max_wait} seconds")
                 
-                if task_ready:
-                    # Step 3: Get results
-                    get_url = f"{base_url}/serp/google/organic/task_get/advanced/{task_id}"
-                    print(f"   📥 Fetching results from: {get_url}")
-                    
-                    result_response = requests.get(get_url, auth=(login, password))
-                    
-                    if result_response.status_code == 200:
-                        result_data = result_response.json()
-                        print("   ✅ Results retrieved successfully!")
-                        
-                        if result_data.get('tasks') and result_data['tasks'][0].get('result'):
-                            items = result_data['tasks'][0]['result'][0].get('items', [])
-                            print(f"   📊 Found {len(items)} SERP items")
-                            
-                            # Check for AI Overview
-                            ai_overview_found = any(item.get('type') == 'ai_overview' for item in items)
-                            print(f"   🤖 AI Overview found: {ai_overview_found}")
-                            
-                            # Show SERP feature types
-                            feature_types = list(set(item.get('type') for item in items))
-                            print(f"   📈 SERP features: {feature_types[:10]}")  # Limit output
-                        else:
-                            print("   ⚠️  No results in response")
-                    else:
-                        print(f"   ❌ Failed to get results: {result_response.status_code}")
-                        print(f"   📝 Response: {result_response.text[:200]}")
+                # Step 3: Postbacks already carry the results; otherwise get every ready task at once
+                ready_order = [task_id for task_id in task_ids if task_id in ready_ids]
+                if callback_runner is not None:
+                    bodies = {task_id: postbacks[task_id] for task_id in ready_order}
                 else:
-                    print(f"   ⏰ Task did not complete within {max_wait} seconds")
-            else:
-                print("   ❌ No task ID in response")
-                print(f"   📝 Response: {task_data}")
-        else:
-            print(f"   ❌ Failed to post task: {response.status_code}")
-            print(f"   📝 Response: {response.text}")
+                    bodies = await fetch_all(session, ready_order)
+                
+                for task, task_id in zip(to_post, task_ids):
+                    body = bodies.get(task_id)
+                    if body is not None:
+                        # Task-level failures are reported but not cached, so a rerun tries again
+                        if task_succeeded(body):
+                            write_cache(['task_get/advanced', task], body)
+                        results[task['keyword']] = body
+                
+                if results:
+                    print("   ✅ Results retrieved successfully!")
             
-    except Exception as e:
-        print(f"   ❌ Error during task-based test: {e}")
+            for task in tasks:
+                body = results.get(task['keyword'])
+                if body is not None:
+                    if len(tasks) > 1:
+                        print(f"   🔎 '{task['keyword']}':")
+                    report_results(body)
+        
+        finally:
+            if callback_runner is not None:
+                await callback_runner.cleanup()
+
+def test_task_based_api():
+    """Test the task-based DataForSEO API approach"""
+    if _AUTH is None:
+        print("❌ No credentials found")
+        return
+    
+    _COALESCER.fetch(TASK_KEY, lambda: asyncio.run(run_task_based_api()))
 
 if __name__ == "__main__":
     test_task_based_api()